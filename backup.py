@@ -0,0 +1,136 @@
+"""
+Online backups of the Flag Reaction Test database.
+
+Snapshots are taken with the SQLite backup API a few pages at a time. The
+database runs in WAL mode (see setup_database) and the backup copies from one
+read snapshot held open for its whole duration, so record_session writes carry
+on while it runs and never force the backup to start over.
+"""
+import logging
+import os
+import sqlite3
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+
+import database_setup as db
+
+log = logging.getLogger(__name__)
+
+
+class BackupScheduler:
+    """
+    Takes a snapshot every `interval` seconds on a background thread and keeps
+    the newest `keep` snapshots in `backup_dir` (default: a backups folder next
+    to the database file, wherever the kiosk was started from).
+    In-memory databases are not backed up.
+    """
+
+    def __init__(self, backup_dir=None, interval=3600, keep=7,
+                 pages_per_step=64, step_pause=0.005, first_delay=60):
+        if backup_dir is None:
+            backup_dir = Path(db.DB_FILE).resolve().parent / "backups"
+        self.backup_dir = Path(backup_dir)
+        self.interval = interval
+        self.keep = keep
+        self.pages_per_step = pages_per_step  # 64 pages of 4 KiB: about 1 ms per step
+        self.step_pause = step_pause          # gap between steps for writers to get in
+        self.first_delay = first_delay
+        self._stop = threading.Event()
+        self._lock = threading.Lock()         # one backup at a time
+        self._thread = None
+
+    # --------------------------
+    # Scheduling
+    # --------------------------
+    def start(self):
+        if self._thread and self._thread.is_alive():
+            return
+        if isinstance(db.get_storage(), db.MemoryStorage):
+            log.info("In-memory database; backups are off")
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="db-backup", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout=5):
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout)
+
+    def _run(self):
+        delay = self.first_delay
+        while not self._stop.wait(delay):
+            try:
+                self.backup_now()
+            except Exception:
+                log.exception("Database backup failed")
+            delay = self.interval
+
+    # --------------------------
+    # Backup
+    # --------------------------
+    def backup_now(self):
+        """Take one snapshot now. Returns its path, or None if it was cancelled."""
+        if isinstance(db.get_storage(), db.MemoryStorage):
+            raise ValueError("In-memory databases are not backed up")
+        with self._lock:
+            self.backup_dir.mkdir(parents=True, exist_ok=True)
+            stem = Path(db.DB_FILE).stem
+            stamp = datetime.now().strftime("%Y%m%d-%H%M%S")
+            target = self.backup_dir / f"{stem}-{stamp}.db"
+            partial = target.with_suffix(".db.partial")
+
+            started = time.perf_counter()
+            src = db.get_connection()
+            src.isolation_level = None
+            dst = sqlite3.connect(partial)
+            try:
+                # Pin a read snapshot; without it every concurrent write would
+                # restart the copy from page one
+                src.execute("BEGIN")
+                src.execute("SELECT COUNT(*) FROM sqlite_master").fetchone()
+                src.backup(dst, pages=self.pages_per_step, progress=self._between_steps)
+            except sqlite3.OperationalError:
+                dst.close()
+                partial.unlink(missing_ok=True)
+                if self._stop.is_set():
+                    log.info("Backup cancelled")
+                    return None
+                raise
+            finally:
+                if src.in_transaction:
+                    src.execute("ROLLBACK")
+                src.close()
+
+            try:
+                result = dst.execute("PRAGMA integrity_check").fetchone()[0]
+            finally:
+                dst.close()
+            if result != "ok":
+                partial.unlink(missing_ok=True)
+                raise RuntimeError(f"Backup failed integrity check: {result}")
+
+            os.replace(partial, target)
+            log.info("Backed up database to %s in %.2fs", target, time.perf_counter() - started)
+            self._rotate(stem)
+            return target
+
+    def _between_steps(self, status, remaining, total):
+        # Called after every step; also gives the GUI thread the GIL back
+        if self._stop.is_set():
+            raise sqlite3.OperationalError("backup cancelled")
+        time.sleep(self.step_pause)
+
+    def _rotate(self, stem):
+        snapshots = sorted(self.backup_dir.glob(f"{stem}-*.db"))
+        for old in snapshots[:-self.keep]:
+            try:
+                old.unlink()
+            except OSError:
+                log.warning("Could not remove old backup %s", old)
+
+    def snapshots(self):
+        """Existing snapshots, oldest first."""
+        return sorted(self.backup_dir.glob(f"{Path(db.DB_FILE).stem}-*.db"))
@@ -0,0 +1,108 @@
+"""
+Compare the stats chart backends: resident memory and render time.
+
+    python benchmarks/chart_backends.py --points 100 1000 5000 --repeat 20
+
+Each backend runs in a fresh interpreter so its imports are measured on their
+own: RSS after QApplication alone, after creating the chart widget (which loads
+the backend), and after rendering; then the median time of plot() for each
+data size. Runs offscreen, so it works over SSH on a kiosk board.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+
+def rss_mb():
+    """Current resident set size in MiB (peak RSS where /proc is unavailable)."""
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    import resource
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024 if sys.platform == "darwin" else 1024)
+
+
+def sample_data(n):
+    start = datetime(2024, 1, 1)
+    dates = [start + timedelta(hours=7 * i) for i in range(n)]
+    scores = [(i * 37) % 50 + (i % 7) * 3 for i in range(n)]
+    return dates, scores
+
+
+def measure(backend, sizes, repeat):
+    """Runs inside the child interpreter."""
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    from PyQt6.QtWidgets import QApplication
+
+    app = QApplication([])
+    result = {"backend": backend, "rss_qt": rss_mb()}
+
+    started = time.perf_counter()
+    from score_chart import make_score_chart
+    chart = make_score_chart(backend)
+    chart.resize(800, 500)
+    chart.show()
+    app.processEvents()
+    result["create_ms"] = (time.perf_counter() - started) * 1000
+    result["rss_widget"] = rss_mb()
+
+    result["render_ms"] = {}
+    for n in sizes:
+        dates, scores = sample_data(n)
+        times = []
+        for _ in range(repeat):
+            t0 = time.perf_counter()
+            chart.plot(f"{n} sessions", dates, scores)
+            app.processEvents()
+            times.append((time.perf_counter() - t0) * 1000)
+        result["render_ms"][str(n)] = statistics.median(times)
+    result["rss_rendered"] = rss_mb()
+    print(json.dumps(result))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare stats chart backends.")
+    parser.add_argument("--points", type=int, nargs="+", default=[100, 1000, 5000])
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        measure(args.child, args.points, args.repeat)
+        return
+
+    from score_chart import CHART_BACKENDS
+    results = []
+    for backend in CHART_BACKENDS:
+        out = subprocess.run(
+            [sys.executable, __file__, "--child", backend, "--repeat", str(args.repeat),
+             "--points", *map(str, args.points)],
+            capture_output=True, text=True, check=True,
+        ).stdout
+        results.append(json.loads(out.strip().splitlines()[-1]))
+
+    header = f"{'backend':<12}{'RSS Qt':>9}{'+ chart':>9}{'rendered':>10}{'create':>10}"
+    header += "".join(f"{f'{n} pts':>11}" for n in args.points)
+    print(header)
+    for r in results:
+        line = (f"{r['backend']:<12}{r['rss_qt']:>7.1f}MB{r['rss_widget']:>7.1f}MB"
+                f"{r['rss_rendered']:>8.1f}MB{r['create_ms']:>8.0f}ms")
+        line += "".join(f"{r['render_ms'][str(n)]:>9.1f}ms" for n in args.points)
+        print(line)
+
+
+if __name__ == "__main__":
+    main()
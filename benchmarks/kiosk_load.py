@@ -0,0 +1,300 @@
+"""
+Scripted load test for the Qt kiosk: a busy testing day, compressed.
+
+    python benchmarks/kiosk_load.py --rounds 2000 --players 40
+
+Runs FlagApp on the offscreen Qt platform against a scratch database and plays
+complete rounds the way an athlete does: click their name in the list, Select
+Player, pick a difficulty, Start Round, sit through the countdown and GO (with
+the countdown tick shortened to --tick-ms), then enter the flag count. Counts
+are entered with synthetic touch events delivered through the window, like a
+real touchscreen, and the harness mixes in the awkward cases:
+
+    tap      one finger on the count
+    double   the same count tapped twice in quick succession
+    overlap  two fingers on two different counts in one touch
+    mouse    a plain mouse click instead of a touch
+
+Reports touch-to-leaderboard latency, whole-round time, rounds per minute and
+RSS growth, then checks the database: every round must have exactly one
+session with the right player, difficulty and count. Exits with status 1 on a
+lost, duplicated or wrong session.
+"""
+import argparse
+import logging
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from PyQt6.QtCore import QEvent, QPoint, QPointF, Qt
+from PyQt6.QtGui import QEventPoint, QInputDevice, QPointingDevice, QTouchEvent
+from PyQt6.QtTest import QTest
+from PyQt6.QtWidgets import QApplication, QPushButton
+
+import database_setup as db
+
+PATTERNS = ("tap", "double", "overlap", "mouse")
+DIFFICULTIES = ("Easy", "Medium", "Hard", "Very Hard")
+
+
+def rss_mb():
+    """Current resident set size in MiB (peak RSS where /proc is unavailable)."""
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    import resource
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024 if sys.platform == "darwin" else 1024)
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    return ordered[min(int(len(ordered) * pct / 100), len(ordered) - 1)]
+
+
+class KioskDriver:
+    """Plays rounds on one FlagApp window through real input events."""
+
+    def __init__(self, app, window, timeout=10.0):
+        self.app = app
+        self.window = window
+        self.timeout = timeout
+        self.touchscreen = QPointingDevice(
+            "load-test touchscreen", 1, QInputDevice.DeviceType.TouchScreen,
+            QPointingDevice.PointerType.Finger, QInputDevice.Capability.Position, 10, 0,
+        )
+        self.count_buttons = {
+            int(btn.text()): btn for btn in window.round_screen.findChildren(QPushButton)
+        }
+        self.difficulty_buttons = {
+            btn.text(): btn for btn in window.player_screen.findChildren(QPushButton)
+            if btn.text() in DIFFICULTIES
+        }
+        self.start_button = self._button(window.player_screen, "Start Round")
+        self.back_button = self._button(window.leaderboard_screen, "Back to Players")
+
+    @staticmethod
+    def _button(screen, text):
+        return next(btn for btn in screen.findChildren(QPushButton) if btn.text() == text)
+
+    def wait_for(self, screen):
+        deadline = time.perf_counter() + self.timeout
+        while self.window.stack.currentWidget() is not screen:
+            if time.perf_counter() > deadline:
+                raise TimeoutError(f"never reached {screen.objectName()}, "
+                                   f"stuck on {self.window.stack.currentWidget().objectName()}")
+            QTest.qWait(1)
+
+    def click(self, widget):
+        QTest.mouseClick(widget, Qt.MouseButton.LeftButton)
+
+    def touch(self, rng, *counts):
+        """Put one finger anywhere on each count button at once, then lift them."""
+        window = self.window
+        handle = window.windowHandle()
+        spots = []
+        for count in counts:
+            rect = self.count_buttons[count].rect().adjusted(1, 1, -1, -1)
+            spot = QPoint(rng.randint(rect.left(), rect.right()), rng.randint(rect.top(), rect.bottom()))
+            spots.append(QPointF(self.count_buttons[count].mapTo(window, spot)))
+        for event_type, state in ((QEvent.Type.TouchBegin, QEventPoint.State.Pressed),
+                                  (QEvent.Type.TouchEnd, QEventPoint.State.Released)):
+            points = [QEventPoint(finger, state, local, window.mapToGlobal(local))
+                      for finger, local in enumerate(spots)]
+            # Through the QWindow, so Qt maps the points onto widgets the way it
+            # does for a real touchscreen
+            QApplication.sendEvent(handle, QTouchEvent(
+                event_type, self.touchscreen, Qt.KeyboardModifier.NoModifier, points))
+
+    def play_round(self, row, difficulty, catches, pattern, rng):
+        """
+        Play one round for the player in list row `row`. Returns
+        (round_token, allowed counts, touch latency, round time).
+        """
+        window = self.window
+        started = time.perf_counter()
+
+        # Start screen: pick the name, Select Player
+        player_list = window.player_list
+        item = player_list.item(row)
+        player_list.scrollToItem(item)
+        QTest.mouseClick(player_list.viewport(), Qt.MouseButton.LeftButton,
+                         Qt.KeyboardModifier.NoModifier, player_list.visualItemRect(item).center())
+        self.click(window.btn_select)
+        self.wait_for(window.player_screen)
+
+        # Difficulty, Start Round, countdown, GO
+        self.click(self.difficulty_buttons[difficulty])
+        self.click(self.start_button)
+        token = window.round_token
+        self.wait_for(window.round_screen)
+
+        # Enter the count
+        allowed = {catches}
+        entered = time.perf_counter()
+        if pattern == "tap":
+            self.touch(rng, catches)
+        elif pattern == "double":
+            self.touch(rng, catches)
+            self.touch(rng, catches)
+        elif pattern == "overlap":
+            other = rng.choice([c for c in self.count_buttons if c != catches])
+            allowed.add(other)
+            self.touch(rng, catches, other)
+        else:
+            self.click(self.count_buttons[catches])
+        self.wait_for(window.leaderboard_screen)
+        self.app.processEvents()
+        done = time.perf_counter()
+
+        self.click(self.back_button)
+        self.wait_for(window.start_screen)
+        return token, allowed, done - entered, done - started
+
+
+def check_sessions(expected, baseline):
+    """Compare the database with what was played. Returns a list of problems."""
+    conn = db.get_connection()
+    cursor = conn.cursor()
+    cursor.execute("SELECT COUNT(*) FROM sessions")
+    total = cursor.fetchone()[0]
+    cursor.execute("SELECT round_token, player_id, difficulty, catches FROM sessions WHERE round_token IS NOT NULL")
+    rows = {}
+    duplicates = []
+    for token, pid, difficulty, catches in cursor.fetchall():
+        if token in rows:
+            duplicates.append(token)
+        rows[token] = (pid, difficulty, catches)
+    conn.close()
+
+    problems = []
+    lost = [token for token in expected if token not in rows]
+    if lost:
+        problems.append(f"{len(lost)} lost rounds, e.g. {lost[:3]}")
+    if duplicates:
+        problems.append(f"{len(duplicates)} duplicated round tokens, e.g. {duplicates[:3]}")
+    extra = total - baseline - len(expected)
+    if extra > 0:
+        problems.append(f"{extra} more sessions than rounds played")
+    wrong = [token for token, (pid, difficulty, allowed) in expected.items()
+             if token in rows and (rows[token][0] != pid or rows[token][1] != difficulty
+                                   or rows[token][2] not in allowed)]
+    if wrong:
+        problems.append(f"{len(wrong)} sessions with the wrong player/difficulty/count, e.g. {wrong[:3]}")
+    return problems
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay rounds against the Qt kiosk and check the results.")
+    parser.add_argument("--rounds", type=int, default=1000)
+    parser.add_argument("--players", type=int, default=30)
+    parser.add_argument("--patterns", nargs="+", choices=PATTERNS, default=list(PATTERNS))
+    parser.add_argument("--tick-ms", type=int, default=1, help="countdown tick / GO duration (app default 1000)")
+    parser.add_argument("--chart", choices=("matplotlib", "native"), default=None)
+    parser.add_argument("--db", help="database file, or :memory: (default: a new temporary file)")
+    parser.add_argument("--touch-log", help="also record touch telemetry to this file")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--sample-every", type=int, default=100, help="rounds between RSS samples")
+    args = parser.parse_args()
+
+    # Stalls are counted in the summary; skip the per-stall stack dumps
+    logging.basicConfig(level=logging.WARNING, format="%(name)s %(levelname)s: %(message)s")
+    logging.getLogger("ui_watchdog").setLevel(logging.ERROR)
+
+    db.configure(args.db or os.path.join(tempfile.mkdtemp(prefix="kiosk-load-"), "load.db"))
+    db.setup_database()
+    print(f"Database: {db.DB_FILE}")
+
+    import qt6_app
+    from ui_watchdog import EventLoopWatchdog
+    from touch_log import TouchRecorder
+    qt6_app.COUNTDOWN_TICK_MS = args.tick_ms
+
+    existing = {name for _, name, _, _ in db.get_all_players()}
+    for i in range(args.players):
+        if f"Load Player {i:03d}" not in existing:
+            db.create_player(f"Load Player {i:03d}", "WR", "Offense")
+
+    app = QApplication(sys.argv[:1])
+    watchdog = EventLoopWatchdog(threshold=0.1)
+    touch_log = TouchRecorder(args.touch_log) if args.touch_log else None
+    window = qt6_app.FlagApp(watchdog=watchdog, chart_backend=args.chart, touch_log=touch_log)
+    window.show()
+    QTest.qWaitForWindowExposed(window)
+    # Players and the leaderboard load in the background after the first frame
+    deadline = time.perf_counter() + 10
+    while not window.interactive and time.perf_counter() < deadline:
+        QTest.qWait(1)
+    watchdog.start()
+    driver = KioskDriver(app, window)
+
+    conn = db.get_connection()
+    baseline = conn.execute("SELECT COUNT(*) FROM sessions").fetchone()[0]
+    conn.close()
+
+    rng = random.Random(args.seed)
+    players = [window.player_list.item(row).data(Qt.ItemDataRole.UserRole)
+               for row in range(window.player_list.count())]
+    expected = {}
+    latencies, round_times, rss = [], [], [(0, rss_mb())]
+    started = time.perf_counter()
+    for n in range(1, args.rounds + 1):
+        row = rng.randrange(len(players))
+        difficulty = rng.choice(DIFFICULTIES)
+        catches = rng.randrange(11)
+        pattern = rng.choice(args.patterns)
+        try:
+            token, allowed, latency, round_time = driver.play_round(row, difficulty, catches, pattern, rng)
+        except TimeoutError as ex:
+            print(f"FAIL: round {n} ({pattern}, {catches} flags): {ex}")
+            sys.exit(1)
+        expected[token] = (players[row], difficulty, allowed)
+        latencies.append(latency)
+        round_times.append(round_time)
+        if n % args.sample_every == 0:
+            rss.append((n, rss_mb()))
+    elapsed = time.perf_counter() - started
+
+    # Let the stats prefetch worker finish before looking at the database
+    window.prefetch_pool.shutdown(wait=True)
+    if touch_log:
+        touch_log.close()
+    app.processEvents()
+    watchdog.stop()
+
+    print(f"{args.rounds} rounds in {elapsed:.1f}s: {args.rounds / elapsed * 60:.0f} rounds/min "
+          f"(countdown tick {args.tick_ms} ms)")
+    for label, values in (("touch -> leaderboard", latencies), ("whole round", round_times)):
+        ms = [v * 1000 for v in values]
+        print(f"{label:<21} p50 {statistics.median(ms):6.1f} ms  p95 {percentile(ms, 95):6.1f} ms  "
+              f"p99 {percentile(ms, 99):6.1f} ms  max {max(ms):6.1f} ms")
+    # Growth measured from the first sample, after caches and imports settle
+    first_n, first_rss = rss[1] if len(rss) > 2 else rss[0]
+    last_n, last_rss = rss[-1]
+    per_1000 = (last_rss - first_rss) / max(last_n - first_n, 1) * 1000
+    print(f"RSS {rss[0][1]:.1f} MB at start, {first_rss:.1f} MB after {first_n} rounds, "
+          f"{last_rss:.1f} MB after {last_n} rounds ({per_1000:+.2f} MB per 1000 rounds)")
+    for line in watchdog.summary_lines():
+        print(line)
+
+    problems = check_sessions(expected, baseline)
+    if problems:
+        for problem in problems:
+            print(f"FAIL: {problem}")
+        sys.exit(1)
+    print(f"OK: {len(expected)} rounds, {len(expected)} sessions, no duplicates or lost rounds")
+
+
+if __name__ == "__main__":
+    main()
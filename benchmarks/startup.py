@@ -0,0 +1,146 @@
+"""
+Time the Qt kiosk's startup, from a cold interpreter to interactive.
+
+    python benchmarks/startup.py --repeat 5
+    python benchmarks/startup.py --against <git revision> --chart matplotlib
+
+Each launch runs in a fresh interpreter on the offscreen platform against a
+copy of one generated database (--players, --sessions). Reported per launch:
+
+    schema       setup_database()
+    built        FlagApp() returned
+    first frame  the window has been shown and painted
+    interactive  the player list and the leaderboard are filled in
+
+All times are from interpreter start. With --against, the same launches are
+timed on that revision (exported with git archive) for a before/after
+comparison.
+"""
+import argparse
+import inspect
+import json
+import os
+import random
+import shutil
+import statistics
+import subprocess
+import sys
+import tarfile
+import tempfile
+import time
+from pathlib import Path
+
+REPO = Path(__file__).resolve().parent.parent
+STAGES = ("schema", "built", "first_frame", "interactive")
+
+
+def measure(tree, db_file, chart):
+    """Runs inside the child interpreter, against the app in `tree`."""
+    started = time.perf_counter()
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    sys.path.insert(0, tree)
+    result = {}
+
+    import database_setup as db
+    db.configure(db_file)
+    db.setup_database()
+    result["schema"] = time.perf_counter() - started
+
+    from PyQt6.QtWidgets import QApplication
+    app = QApplication([])
+    import qt6_app
+    if "chart_backend" in inspect.signature(qt6_app.FlagApp).parameters:
+        window = qt6_app.FlagApp(chart_backend=chart)
+    else:
+        window = qt6_app.FlagApp()
+    result["built"] = time.perf_counter() - started
+
+    window.show()
+    app.processEvents()
+    window.repaint()
+    result["first_frame"] = time.perf_counter() - started
+
+    def filled():
+        item = window.player_list.item(0)
+        return (item is not None and item.data(qt6_app.Qt.ItemDataRole.UserRole) is not None
+                and window.table.rowCount() > 0)
+
+    deadline = time.perf_counter() + 30
+    while not filled() and time.perf_counter() < deadline:
+        app.processEvents()
+        time.sleep(0.001)
+    result["interactive"] = time.perf_counter() - started
+    print(json.dumps({key: value * 1000 for key, value in result.items()}))
+    # Skip Qt/matplotlib teardown; it is not part of startup
+    sys.stdout.flush()
+    os._exit(0)
+
+
+def make_database(path, players, sessions, seed=1):
+    sys.path.insert(0, str(REPO))
+    import database_setup as db
+    db.configure(path)
+    db.setup_database()
+    rng = random.Random(seed)
+    ids = [db.create_player(f"Player {i:04d}", "WR", "Offense") for i in range(players)]
+    difficulties = list(db.DEFAULT_MULTIPLIERS)
+    for start in range(0, sessions, 10000):
+        db.record_sessions([(rng.choice(ids), rng.choice(difficulties), rng.randrange(11), None)
+                            for _ in range(min(10000, sessions - start))])
+
+
+def run_tree(tree, db_file, chart, repeat):
+    runs = []
+    for _ in range(repeat):
+        out = subprocess.run(
+            [sys.executable, __file__, "--child", str(tree), "--db", str(db_file), "--chart", chart],
+            capture_output=True, text=True, check=True,
+        ).stdout
+        runs.append(json.loads(out.strip().splitlines()[-1]))
+    return {stage: statistics.median(run[stage] for run in runs) for stage in STAGES}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Time the Qt kiosk's startup.")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--against", help="git revision to compare with")
+    parser.add_argument("--chart", choices=("matplotlib", "native"), default="matplotlib")
+    parser.add_argument("--players", type=int, default=200)
+    parser.add_argument("--sessions", type=int, default=100000)
+    parser.add_argument("--db", help=argparse.SUPPRESS)
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        measure(args.child, args.db, args.chart)
+        return
+
+    tmp = Path(tempfile.mkdtemp(prefix="startup-bench-"))
+    try:
+        template = tmp / "template.db"
+        make_database(template, args.players, args.sessions)
+        trees = [("working tree", REPO)]
+        if args.against:
+            archive = tmp / "tree.tar"
+            subprocess.run(["git", "-C", str(REPO), "archive", "-o", str(archive), args.against], check=True)
+            with tarfile.open(archive) as tar:
+                tar.extractall(tmp / "tree")
+            trees.insert(0, (args.against, tmp / "tree"))
+
+        results = []
+        for index, (label, tree) in enumerate(trees):
+            db_file = tmp / f"run-{index}.db"
+            shutil.copy(template, db_file)
+            results.append((label, run_tree(tree, db_file, args.chart, args.repeat)))
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+    print(f"{args.players} players, {args.sessions} sessions, {args.chart} chart, "
+          f"median of {args.repeat} launches (ms from interpreter start)")
+    print(f"{'tree':<14}" + "".join(f"{stage.replace('_', ' '):>14}" for stage in STAGES))
+    for label, result in results:
+        print(f"{label[:13]:<14}" + "".join(f"{result[stage]:>14.0f}" for stage in STAGES))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""
+Time admin/player mode switches and screen switches in the Qt kiosk.
+
+    python benchmarks/theme_switch.py --repeat 200
+    python benchmarks/theme_switch.py --against <git revision>
+
+Each tree runs in a fresh interpreter on the offscreen platform. Every switch is
+timed until the event loop has processed it and the window has been painted,
+so style recalculation, polishing and layout are all included. With --against,
+the same measurements are taken on that revision (exported with git archive)
+for a before/after comparison.
+"""
+import argparse
+import json
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tarfile
+import tempfile
+import time
+from pathlib import Path
+
+REPO = Path(__file__).resolve().parent.parent
+SCREENS = ("start_screen", "player_screen", "countdown_screen", "go_screen",
+           "round_screen", "leaderboard_screen", "stats_screen", "history_screen")
+
+
+def measure(tree, repeat):
+    """Runs inside the child interpreter, against the app in `tree`."""
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    os.environ["FLAG_CHART_BACKEND"] = "native"
+    sys.path.insert(0, tree)
+    import database_setup as db
+    db.configure(":memory:")
+    db.setup_database()
+
+    from PyQt6.QtWidgets import QApplication
+    app = QApplication([])
+    import qt6_app
+    window = qt6_app.FlagApp()
+    window.show()
+    app.processEvents()
+
+    def timed(action):
+        started = time.perf_counter()
+        action()
+        app.processEvents()
+        window.repaint()
+        return (time.perf_counter() - started) * 1000
+
+    result = {"admin": [], "player": [], "screens": []}
+    for _ in range(repeat):
+        result["admin"].append(timed(window.switch_to_admin_mode))
+        result["player"].append(timed(window.switch_to_player_mode))
+        for name in SCREENS:
+            result["screens"].append(timed(lambda: window.switch_to(getattr(window, name))))
+    print(json.dumps({key: [statistics.median(v), max(v)] for key, v in result.items()}))
+
+
+def run_tree(tree, repeat):
+    out = subprocess.run(
+        [sys.executable, __file__, "--child", str(tree), "--repeat", str(repeat)],
+        capture_output=True, text=True, check=True,
+    ).stdout
+    return json.loads(out.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Time mode and screen switches in the Qt kiosk.")
+    parser.add_argument("--repeat", type=int, default=200)
+    parser.add_argument("--against", help="git revision to compare with")
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        measure(args.child, args.repeat)
+        return
+
+    results = [("working tree", run_tree(REPO, args.repeat))]
+    if args.against:
+        tmp = Path(tempfile.mkdtemp(prefix="theme-bench-"))
+        try:
+            archive = tmp / "tree.tar"
+            subprocess.run(["git", "-C", str(REPO), "archive", "-o", str(archive), args.against], check=True)
+            with tarfile.open(archive) as tar:
+                tar.extractall(tmp / "tree")
+            results.insert(0, (args.against, run_tree(tmp / "tree", args.repeat)))
+        finally:
+            shutil.rmtree(tmp, ignore_errors=True)
+
+    print(f"{'tree':<14}{'to admin':>20}{'to player':>20}{'screen switch':>20}")
+    print(f"{'':<14}{'median / max':>20}{'median / max':>20}{'median / max':>20}")
+    for label, r in results:
+        cells = "".join(f"{r[key][0]:>10.2f} /{r[key][1]:>6.2f} ms" for key in ("admin", "player", "screens"))
+        print(f"{label[:13]:<14}{cells}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,25 +1,282 @@
 import sqlite3
 import os
 import csv
+import hashlib
+import itertools
+import logging
+import multiprocessing
+import threading
+import time
+import uuid
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
 from pathlib import Path
 
 import tkinter as tk
 from tkinter import filedialog
 
-DB_FILE = "flag_reaction_test.db"
+log = logging.getLogger(__name__)
+
+# Default database location: next to this module, so every launch directory
+# shares one database. Override with FLAG_DB_FILE or configure().
+DEFAULT_DB_FILE = str(Path(__file__).resolve().with_name("flag_reaction_test.db"))
+DB_FILE = DEFAULT_DB_FILE
+
+# Score multipliers used until coaches add a new scoring_rules version
+DEFAULT_MULTIPLIERS = {"Easy": 1, "Medium": 2, "Hard": 3, "Very Hard": 5}
+
+# Stored in PRAGMA user_version once setup_database has run. Bump it whenever
+# setup_database changes the schema, so existing databases get upgraded.
+#   2: content_hash no longer includes the score
+#   3: trg_sessions_update no longer fires on score (recompute_scores stamps per chunk)
+SCHEMA_VERSION = 3
+
+# Column layout written by export_to_csv and read back by import_sessions_from_csv
+SESSION_CSV_HEADER = ["Player", "Difficulty", "Position", "Side", "Flags", "Score", "Date"]
+
+# ---------------------------
+# Storage
+# ---------------------------
+# Every function in this module gets its connections from the active storage
+# object, so tests and benchmarks can swap the on-disk file for a RAM database.
+
+def _enforce_foreign_keys(conn):
+    # Off by default in SQLite and set per connection; deleting a player
+    # relies on it to cascade to their sessions
+    conn.execute("PRAGMA foreign_keys=ON")
+    return conn
+
+
+class FileStorage:
+    """Database kept in a file on disk."""
+
+    def __init__(self, path):
+        self.path = str(path)
+
+    def connect(self):
+        return _enforce_foreign_keys(sqlite3.connect(self.path))
+
+    def __repr__(self):
+        return f"FileStorage({self.path!r})"
+
+
+class MemoryStorage:
+    """
+    Shared-cache in-memory database. All connections from connect() see the
+    same data for as long as this object is open. Each instance gets its own
+    name by default, so parallel test runs never see each other's data.
+    """
+
+    def __init__(self, name=None):
+        self.name = name or f"flagdb-{uuid.uuid4().hex}"
+        self.uri = f"file:{self.name}?mode=memory&cache=shared"
+        # The database is dropped when its last connection closes; keep one open
+        self._keepalive = sqlite3.connect(self.uri, uri=True, check_same_thread=False)
+
+    def connect(self):
+        return _enforce_foreign_keys(sqlite3.connect(self.uri, uri=True))
+
+    def close(self):
+        self._keepalive.close()
+
+    def __repr__(self):
+        return f"MemoryStorage({self.name!r})"
+
+
+_storage = None
+
+def configure(target=None):
+    """
+    Point this module at a database and return the storage object.
+    `target` may be a file path, ":memory:", or any object with a connect()
+    method. With no argument, FLAG_DB_FILE or DEFAULT_DB_FILE is used.
+    """
+    global _storage, DB_FILE
+    if target is None:
+        target = os.environ.get("FLAG_DB_FILE") or DEFAULT_DB_FILE
+    if isinstance(target, (str, os.PathLike)):
+        target = MemoryStorage() if str(target) == ":memory:" else FileStorage(target)
+    _storage = target
+    DB_FILE = getattr(target, "path", ":memory:")
+    return target
+
+def get_storage():
+    """Return the storage object currently in use."""
+    return _storage
+
+configure()
+
+# ---------------------------
+# Change Notifications
+# ---------------------------
+# In-process publish/subscribe for windows that follow the data without
+# polling (the spectator leaderboard). Write functions call _notify after
+# their commit with what changed:
+#     listener("sessions", session_ids)   recorded, rewritten or rescored
+#     listener("players", player_ids)     created, deleted or archived
+# ids is None when too much changed to list (imports, rescoring).
+# Listeners run on the writer's thread and must be quick; GUI listeners should
+# hand the event over to their own thread (e.g. by emitting a Qt signal).
+
+_listeners = ()
+
+def subscribe(listener):
+    """Call listener(kind, ids) after every committed change. Returns listener."""
+    global _listeners
+    _listeners = _listeners + (listener,)
+    return listener
+
+def unsubscribe(listener):
+    global _listeners
+    _listeners = tuple(l for l in _listeners if l is not listener)
+
+def _notify(kind, ids=None):
+    for listener in _listeners:
+        try:
+            listener(kind, ids)
+        except Exception:
+            # A broken listener must never undo or block a write
+            log.exception("Change listener %r failed", listener)
+
+
+class ChangeWatcher:
+    """
+    Cheap check for commits made by other processes (another kiosk, a CLI
+    import, a manual fix in the sqlite3 shell), which the listeners above never
+    hear about. Keeps one connection open; poll() costs a single
+    PRAGMA data_version until something commits, then reads the counters kept
+    by the triggers from _create_change_tracking.
+    Commits made by this module's write functions in this process are left
+    out (see _commit_write); their listeners have already been told.
+    """
+
+    def __init__(self, publish=False):
+        # With publish, changes found are also sent to subscribe() listeners
+        self.publish = publish
+        self._storage = None
+        self._conn = None
+        self._data_version = None
+        self._counters = None
+
+    def poll(self):
+        """
+        Return (tables, player_ids): the tracked tables and the players whose
+        rows or sessions changed since the last poll. The first poll only
+        records where things stand and returns two empty sets.
+        """
+        if self._conn is None:
+            self._storage = _storage
+            self._conn = get_connection()
+        data_version = self._conn.execute("PRAGMA data_version").fetchone()[0]
+        if data_version == self._data_version:
+            return set(), set()
+        self._data_version = data_version
+
+        counters = _read_counters(self._conn)
+        previous, self._counters = self._counters, counters
+        if previous is None or counters == previous:
+            return set(), set()
+
+        # Take away what this process's own commits added since the last poll
+        start, end = previous.get("any", 0), counters.get("any", 0)
+        moved = {t: counters.get(t, 0) - previous.get(t, 0) for t in CHANGE_TRACKED_TABLES}
+        with _own_changes_lock:
+            own = list(_own_changes)
+        for storage, before, after, deltas in own:
+            if storage is self._storage and start <= before and after <= end:
+                for table, delta in deltas.items():
+                    moved[table] -= delta
+        tables = {t for t, delta in moved.items() if delta > 0}
+        if not tables:
+            return set(), set()
+        # Players stamped by our own commits in between are included too
+        player_ids = {row[0] for row in self._conn.execute(
+            "SELECT player_id FROM player_versions WHERE version > ?", (start,))}
+        if self.publish:
+            for table in sorted(tables):
+                _notify(table)
+        return tables, player_ids
+
+    def close(self):
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+# (storage, any before, any after, {table: change}) of recent commits from this process
+_own_changes = deque(maxlen=1000)
+_own_changes_lock = threading.Lock()
+
+def _read_counters(conn):
+    return dict(conn.execute("SELECT table_name, version FROM change_counters"))
+
+def _begin_write(conn):
+    """
+    Start a write transaction on conn and return the change counters as it
+    finds them. IMMEDIATE takes the write lock up front, so nobody else can
+    commit between this read and _commit_write.
+    """
+    conn.execute("BEGIN IMMEDIATE")
+    return _read_counters(conn)
+
+def _commit_write(conn, before):
+    """Commit a _begin_write transaction and remember its changes as this process's own."""
+    after = _read_counters(conn)
+    conn.commit()
+    if after.get("any") != before.get("any"):
+        deltas = {t: after.get(t, 0) - before.get(t, 0) for t in CHANGE_TRACKED_TABLES}
+        with _own_changes_lock:
+            _own_changes.append((_storage, before.get("any", 0), after.get("any", 0), deltas))
 
 # ---------------------------
 # Connection & Setup
 # ---------------------------
 def get_connection():
-    """Return a connection to the SQLite database."""
-    return sqlite3.connect(DB_FILE)
+    """Return a connection to the configured database."""
+    return _storage.connect()
+
+# Column lists of the tables that had to be rebuilt for ON DELETE CASCADE
+SESSIONS_SCHEMA = """(
+        session_id INTEGER PRIMARY KEY AUTOINCREMENT,
+        player_id INTEGER NOT NULL,
+        difficulty TEXT CHECK(difficulty IN ('Easy','Medium','Hard','Very Hard')),
+        catches INTEGER NOT NULL,
+        score INTEGER NOT NULL,
+        played_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        content_hash TEXT,
+        round_token TEXT,
+        rule_version INTEGER DEFAULT 1,
+        FOREIGN KEY (player_id) REFERENCES players(player_id) ON DELETE CASCADE
+    )"""
+
+PLAYER_BEST_SCHEMA = """(
+        player_id INTEGER PRIMARY KEY,
+        session_id INTEGER NOT NULL,
+        score INTEGER NOT NULL,
+        FOREIGN KEY (player_id) REFERENCES players(player_id) ON DELETE CASCADE
+    )"""
 
 def setup_database():
-    """Create tables if they don't exist (with Position and Side)."""
+    """
+    Create tables if they don't exist (with Position and Side) and upgrade
+    older databases. A database already at SCHEMA_VERSION is left alone,
+    which keeps startup down to one PRAGMA read.
+    Returns True if the schema was (re)applied.
+    """
     conn = get_connection()
     cursor = conn.cursor()
+    user_version = cursor.execute("PRAGMA user_version").fetchone()[0]
+    if user_version == SCHEMA_VERSION:
+        conn.close()
+        return False
+
+    # Only takes effect on a brand-new file; older databases are converted
+    # by the idle maintenance job (maintenance.py)
+    cursor.execute("PRAGMA auto_vacuum=INCREMENTAL")
+
+    # WAL lets readers (e.g. the online backup) run alongside writers;
+    # the setting is stored in the database file itself
+    cursor.execute("PRAGMA journal_mode=WAL")
 
     cursor.execute("""
     CREATE TABLE IF NOT EXISTS players (
@@ -31,52 +288,230 @@ def setup_database():
     );
     """)
 
+    cursor.execute(f"CREATE TABLE IF NOT EXISTS sessions {SESSIONS_SCHEMA};")
+
+    # Columns added after the first release
+    _add_column_if_missing(cursor, "players", "archived_at", "TIMESTAMP")
+    _add_column_if_missing(cursor, "sessions", "content_hash", "TEXT")
+    _add_column_if_missing(cursor, "sessions", "round_token", "TEXT")
+    # Rows from before versioned scoring were all scored with version 1
+    _add_column_if_missing(cursor, "sessions", "rule_version", "INTEGER DEFAULT 1")
+    conn.commit()
+    _add_cascade_if_missing(conn, "sessions", SESSIONS_SCHEMA)
+
+    # Versioned score multipliers; the highest version is the current one
     cursor.execute("""
-    CREATE TABLE IF NOT EXISTS sessions (
-        session_id INTEGER PRIMARY KEY AUTOINCREMENT,
-        player_id INTEGER NOT NULL,
-        difficulty TEXT CHECK(difficulty IN ('Easy','Medium','Hard','Very Hard')),
-        catches INTEGER NOT NULL,
-        score INTEGER NOT NULL,
-        played_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-        FOREIGN KEY (player_id) REFERENCES players(player_id)
+    CREATE TABLE IF NOT EXISTS scoring_rules (
+        version INTEGER NOT NULL,
+        difficulty TEXT NOT NULL CHECK(difficulty IN ('Easy','Medium','Hard','Very Hard')),
+        multiplier INTEGER NOT NULL,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        PRIMARY KEY (version, difficulty)
     );
     """)
+    cursor.executemany(
+        "INSERT OR IGNORE INTO scoring_rules (version, difficulty, multiplier) VALUES (1,?,?)",
+        DEFAULT_MULTIPLIERS.items()
+    )
+
+    # Each player's best session, kept current by the write paths below, so the
+    # best-per-player leaderboard never has to group the whole sessions table
+    cursor.execute(f"CREATE TABLE IF NOT EXISTS player_best {PLAYER_BEST_SCHEMA};")
+    conn.commit()
+    _add_cascade_if_missing(conn, "player_best", PLAYER_BEST_SCHEMA)
+    cursor.execute("""
+    CREATE INDEX IF NOT EXISTS idx_player_best_score
+        ON player_best (score, session_id);
+    """)
+    cursor.execute("SELECT EXISTS (SELECT 1 FROM player_best), EXISTS (SELECT 1 FROM sessions)")
+    has_best, has_sessions = cursor.fetchone()
+    if has_sessions and not has_best:
+        _refresh_player_best(cursor)
+
+    # Indexes backing the keyset-paginated queries below
+    cursor.execute("""
+    CREATE INDEX IF NOT EXISTS idx_sessions_player_played
+        ON sessions (player_id, played_at, session_id);
+    """)
+    cursor.execute("""
+    CREATE INDEX IF NOT EXISTS idx_sessions_score
+        ON sessions (score, session_id);
+    """)
+    cursor.execute("""
+    CREATE INDEX IF NOT EXISTS idx_sessions_content_hash
+        ON sessions (content_hash);
+    """)
+    # One row per physical round, however many times it is written
+    cursor.execute("""
+    CREATE UNIQUE INDEX IF NOT EXISTS idx_sessions_round_token
+        ON sessions (round_token);
+    """)
+
+    if user_version < 2:
+        # Hashes written before version 2 included the score
+        _hash_sessions(conn, "content_hash IS NOT NULL")
+
+    # After the table rebuilds above, which would drop the triggers
+    _create_change_tracking(cursor)
+    cursor.execute(f"PRAGMA user_version={SCHEMA_VERSION}")
     conn.commit()
     conn.close()
+    return True
+
+def _add_column_if_missing(cursor, table, column, decl):
+    """ALTER an existing table to add a column that newer code expects."""
+    cursor.execute(f"PRAGMA table_info({table})")
+    if column not in [row[1] for row in cursor.fetchall()]:
+        cursor.execute(f"ALTER TABLE {table} ADD COLUMN {column} {decl}")
+
+def _add_cascade_if_missing(conn, table, schema):
+    """
+    Rebuild a table created before its player_id foreign key had ON DELETE
+    CASCADE (SQLite can't ALTER a constraint). Its indexes are dropped with it
+    and recreated by the CREATE INDEX IF NOT EXISTS statements in setup_database.
+    """
+    foreign_keys = conn.execute(f"PRAGMA foreign_key_list({table})").fetchall()
+    if all(fk[6] == "CASCADE" for fk in foreign_keys):
+        return
+    columns = ", ".join(row[1] for row in conn.execute(f"PRAGMA table_info({table})"))
+    conn.execute("PRAGMA foreign_keys=OFF")
+    try:
+        conn.execute("BEGIN")
+        conn.execute(f"CREATE TABLE {table}_rebuild {schema}")
+        conn.execute(f"INSERT INTO {table}_rebuild ({columns}) SELECT {columns} FROM {table}")
+        # Keep AUTOINCREMENT from handing out ids of already deleted rows
+        seq = conn.execute("SELECT seq FROM sqlite_sequence WHERE name=?", (table,)).fetchone()
+        conn.execute(f"DROP TABLE {table}")
+        conn.execute(f"ALTER TABLE {table}_rebuild RENAME TO {table}")
+        if seq:
+            conn.execute("UPDATE sqlite_sequence SET seq = MAX(seq, ?) WHERE name=?", (seq[0], table))
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        conn.execute("PRAGMA foreign_keys=ON")
+
+# Tables whose changes ChangeWatcher reports
+CHANGE_TRACKED_TABLES = ("players", "sessions")
+
+def _create_change_tracking(cursor):
+    """
+    Triggers behind ChangeWatcher. Every committed change to a tracked table,
+    from any connection or process (the sqlite3 shell included), bumps that
+    table's row and the 'any' row in change_counters, and stamps the player it
+    touched in player_versions with the new 'any' value.
+    """
+    cursor.execute("""
+    CREATE TABLE IF NOT EXISTS change_counters (
+        table_name TEXT PRIMARY KEY,
+        version INTEGER NOT NULL DEFAULT 0
+    );
+    """)
+    cursor.executemany(
+        "INSERT OR IGNORE INTO change_counters (table_name) VALUES (?)",
+        [("any",)] + [(table,) for table in CHANGE_TRACKED_TABLES]
+    )
+    # No foreign key: a deleted player's row is how watchers hear about it
+    cursor.execute("""
+    CREATE TABLE IF NOT EXISTS player_versions (
+        player_id INTEGER PRIMARY KEY,
+        version INTEGER NOT NULL
+    );
+    """)
+
+    def stamp(table, player, when="TRUE"):
+        return f"""
+            UPDATE change_counters SET version = version + 1 WHERE table_name IN ('any', '{table}');
+            INSERT INTO player_versions (player_id, version)
+            SELECT {player}, version FROM change_counters WHERE table_name = 'any' AND {when}
+            ON CONFLICT(player_id) DO UPDATE SET version = excluded.version;
+        """
+
+    triggers = {
+        "trg_players_insert": ("AFTER INSERT ON players", stamp("players", "NEW.player_id")),
+        "trg_players_update": ("AFTER UPDATE ON players", stamp("players", "NEW.player_id")),
+        "trg_players_delete": ("AFTER DELETE ON players", stamp("players", "OLD.player_id")),
+        "trg_sessions_insert": ("AFTER INSERT ON sessions", stamp("sessions", "NEW.player_id")),
+        # Not content_hash: backfilling it during imports changes nothing visible.
+        # Not score: only recompute_scores rewrites it without catches, and it
+        # stamps each chunk once instead of once per row (_stamp_changes)
+        "trg_sessions_update": (
+            "AFTER UPDATE OF player_id, difficulty, catches, played_at ON sessions",
+            stamp("sessions", "NEW.player_id")
+            + stamp("sessions", "OLD.player_id", "OLD.player_id IS NOT NEW.player_id")),
+        "trg_sessions_delete": ("AFTER DELETE ON sessions", stamp("sessions", "OLD.player_id")),
+    }
+    for name, (event, body) in triggers.items():
+        # Recreated, so upgrades pick up changed definitions
+        cursor.execute(f"DROP TRIGGER IF EXISTS {name}")
+        cursor.execute(f"CREATE TRIGGER {name} {event} BEGIN {body} END;")
+
+def _stamp_changes(cursor, table, player_ids):
+    """
+    What the triggers above do per row, done once for a set-based write:
+    bump the table's and the 'any' counter, and stamp the players it touched.
+    """
+    cursor.execute("UPDATE change_counters SET version = version + 1 WHERE table_name IN ('any', ?)", (table,))
+    cursor.execute("SELECT version FROM change_counters WHERE table_name = 'any'")
+    version = cursor.fetchone()[0]
+    cursor.executemany("""
+        INSERT INTO player_versions (player_id, version) VALUES (?, ?)
+        ON CONFLICT(player_id) DO UPDATE SET version = excluded.version
+    """, [(pid, version) for pid in player_ids])
 
 # ---------------------------
 # Player Functions (no changes, but players now have position + side fields)
 # ---------------------------
 def create_player(name, position=None, side=None):
-    """Add a new player. Returns player_id or None if name exists."""
+    """
+    Add a new player. An archived player with the same name is brought back
+    instead, sessions and all. Returns player_id or None if name exists.
+    """
     conn = get_connection()
     cursor = conn.cursor()
     try:
-        cursor.execute("INSERT INTO players (name, position, side) VALUES (?,?,?)", (name, position, side))
-        conn.commit()
-    except sqlite3.IntegrityError:
+        before = _begin_write(conn)
+        try:
+            cursor.execute("INSERT INTO players (name, position, side) VALUES (?,?,?)", (name, position, side))
+        except sqlite3.IntegrityError:
+            cursor.execute("""
+                UPDATE players
+                SET archived_at = NULL, position = COALESCE(?, position), side = COALESCE(?, side)
+                WHERE name = ? AND archived_at IS NOT NULL
+            """, (position, side, name))
+            if cursor.rowcount == 0:
+                conn.rollback()
+                return None
+        cursor.execute("SELECT player_id FROM players WHERE name = ?", (name,))
+        pid = cursor.fetchone()[0]
+        _refresh_player_best(cursor, [pid])
+        _commit_write(conn, before)
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
         conn.close()
-        return None
-    cursor.execute("SELECT player_id FROM players WHERE name = ?", (name,))
-    pid = cursor.fetchone()[0]
-    conn.close()
+    _notify("players", [pid])
     return pid
 
 def get_all_players():
-    """Return a list of tuples (player_id, name, position, side)."""
+    """Return a list of tuples (player_id, name, position, side) of players not archived."""
     conn = get_connection()
     cursor = conn.cursor()
-    cursor.execute("SELECT player_id, name, position, side FROM players ORDER BY name")
+    cursor.execute("SELECT player_id, name, position, side FROM players WHERE archived_at IS NULL ORDER BY name")
     rows = cursor.fetchall()
     conn.close()
     return rows
 
-def get_player_by_id(player_id):
+def get_player_by_id(player_id, include_archived=True):
     """Return a dict with player info, or None."""
     conn = get_connection()
     cursor = conn.cursor()
-    cursor.execute("SELECT player_id, name, position, side FROM players WHERE player_id=?", (player_id,))
+    cursor.execute(f"""
+        SELECT player_id, name, position, side FROM players
+        WHERE player_id=? {"" if include_archived else "AND archived_at IS NULL"}
+    """, (player_id,))
     row = cursor.fetchone()
     conn.close()
     if row:
@@ -85,44 +520,306 @@ def get_player_by_id(player_id):
 
 def delete_player(player_id):
     """Delete a player and their sessions."""
+    delete_players([player_id])
+
+def delete_players(player_ids):
+    """
+    Delete many players in one transaction. Their sessions and player_best rows
+    go with them through ON DELETE CASCADE. Returns the number of players deleted.
+    """
     conn = get_connection()
     cursor = conn.cursor()
-    cursor.execute("DELETE FROM sessions WHERE player_id=?", (player_id,))
-    cursor.execute("DELETE FROM players WHERE player_id=?", (player_id,))
-    conn.commit()
-    conn.close()
+    deleted = 0
+    try:
+        before = _begin_write(conn)
+        for marks, chunk in _id_chunks(player_ids):
+            cursor.execute(f"DELETE FROM players WHERE player_id IN ({marks})", chunk)
+            deleted += cursor.rowcount
+        _commit_write(conn, before)
+    finally:
+        conn.close()
+    if deleted:
+        _notify("players", list(player_ids))
+    return deleted
+
+def archive_players(player_ids):
+    """
+    Take many players off the roster and leaderboards in one transaction while
+    keeping their sessions (CSV exports and reports still include them).
+    Returns the number of players archived.
+    """
+    conn = get_connection()
+    cursor = conn.cursor()
+    archived = 0
+    try:
+        before = _begin_write(conn)
+        for marks, chunk in _id_chunks(player_ids):
+            cursor.execute(f"""
+                UPDATE players SET archived_at = CURRENT_TIMESTAMP
+                WHERE player_id IN ({marks}) AND archived_at IS NULL
+            """, chunk)
+            archived += cursor.rowcount
+            cursor.execute(f"DELETE FROM player_best WHERE player_id IN ({marks})", chunk)
+        _commit_write(conn, before)
+    finally:
+        conn.close()
+    if archived:
+        _notify("players", list(player_ids))
+    return archived
+
+def unarchive_players(player_ids):
+    """Put archived players back on the roster and leaderboards. Returns the number restored."""
+    conn = get_connection()
+    cursor = conn.cursor()
+    restored = 0
+    try:
+        before = _begin_write(conn)
+        for marks, chunk in _id_chunks(player_ids):
+            cursor.execute(f"""
+                UPDATE players SET archived_at = NULL
+                WHERE player_id IN ({marks}) AND archived_at IS NOT NULL
+            """, chunk)
+            restored += cursor.rowcount
+        if restored:
+            _refresh_player_best(cursor, player_ids)
+        _commit_write(conn, before)
+    finally:
+        conn.close()
+    if restored:
+        _notify("players", list(player_ids))
+    return restored
+
+def _id_chunks(ids, size=500):
+    """Yield ("?,?,...", ids) pieces that stay under SQLite's bound-parameter limit."""
+    ids = list(ids)
+    for start in range(0, len(ids), size):
+        chunk = ids[start:start + size]
+        yield ",".join("?" * len(chunk)), chunk
 
 # ---------------------------
 # Session Functions (no change)
 # ---------------------------
 
-def record_session(player_id, difficulty, catches):
-    """Insert a new session for a player."""
-    multiplier = {"Easy":1, "Medium":2, "Hard":3, "Very Hard":5}[difficulty]
-    score = catches * multiplier
+def record_session(player_id, difficulty, catches, round_token=None):
+    """
+    Insert a new session for a player and return its session_id.
+    Writing the same round_token again updates that session instead of adding
+    a second one, so a round can be retried or replayed safely.
+    """
+    return record_sessions([(player_id, difficulty, catches, round_token)])[0]
+
+def record_sessions(rounds):
+    """
+    Insert several sessions in one transaction and return their session_ids.
+    `rounds` is a list of (player_id, difficulty, catches, round_token);
+    round_token may be None for rounds that don't need de-duplication.
+    """
     conn = get_connection()
     cursor = conn.cursor()
-    cursor.execute(
-        "INSERT INTO sessions (player_id, difficulty, catches, score) VALUES (?,?,?,?)",
-        (player_id, difficulty, catches, score)
+    try:
+        before = _begin_write(conn)
+        version, multipliers = _current_scoring_rules(cursor)
+        session_ids = []
+        for player_id, difficulty, catches, round_token in rounds:
+            if difficulty not in multipliers:
+                raise ValueError(f"Unknown difficulty: {difficulty!r}")
+            score = catches * multipliers[difficulty]
+            existing = None
+            if round_token is not None:
+                cursor.execute("SELECT session_id, player_id FROM sessions WHERE round_token=?", (round_token,))
+                existing = cursor.fetchone()
+            cursor.execute("""
+                INSERT INTO sessions (player_id, difficulty, catches, score, round_token, rule_version)
+                VALUES (?,?,?,?,?,?)
+                ON CONFLICT(round_token) DO UPDATE SET
+                    difficulty = excluded.difficulty,
+                    catches = excluded.catches,
+                    score = excluded.score,
+                    rule_version = excluded.rule_version,
+                    -- Hashed the old content; the next import hashes it again
+                    content_hash = NULL
+            """, (player_id, difficulty, catches, score, round_token, version))
+
+            if existing is None:
+                session_id = cursor.lastrowid
+                # New session: it can only raise the player's best. player_best
+                # never holds archived players, even if one is sent a round
+                cursor.execute("""
+                    INSERT INTO player_best (player_id, session_id, score)
+                    SELECT ?, ?, ?
+                    WHERE EXISTS (SELECT 1 FROM players WHERE player_id = ? AND archived_at IS NULL)
+                    ON CONFLICT(player_id) DO UPDATE SET
+                        session_id = excluded.session_id,
+                        score = excluded.score
+                    WHERE excluded.score > player_best.score
+                """, (player_id, session_id, score, player_id))
+            else:
+                # A rewrite may have lowered the best session's score
+                session_id = existing[0]
+                _refresh_player_best(cursor, [existing[1]])
+            session_ids.append(session_id)
+        _commit_write(conn, before)
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+    _notify("sessions", session_ids)
+    return session_ids
+
+def _refresh_player_best(cursor, player_ids=None):
+    """Recompute player_best from sessions, for some players or all of them."""
+    if player_ids is not None:
+        player_ids = list(player_ids)
+        if len(player_ids) > 500:
+            player_ids = None  # stay under SQLite's bound-parameter limit
+    if player_ids is None:
+        cursor.execute("DELETE FROM player_best")
+        where, params = "", ()
+    else:
+        marks = ",".join("?" * len(player_ids))
+        cursor.execute(f"DELETE FROM player_best WHERE player_id IN ({marks})", player_ids)
+        where, params = f"AND player_id IN ({marks})", player_ids
+    # SQLite fills bare columns from the row that holds the MAX()
+    cursor.execute(f"""
+        INSERT INTO player_best (player_id, session_id, score)
+        SELECT player_id, session_id, MAX(score)
+        FROM sessions
+        WHERE player_id IN (SELECT player_id FROM players WHERE archived_at IS NULL)
+        {where}
+        GROUP BY player_id
+    """, params)
+
+# ---------------------------
+# Scoring Rules
+# ---------------------------
+# score = catches * multiplier[difficulty], with multipliers kept per version in
+# scoring_rules. Each session remembers the version it was scored with, so a new
+# version can be applied to history with recompute_scores().
+
+def _current_scoring_rules(cursor):
+    cursor.execute("""
+        SELECT version, difficulty, multiplier FROM scoring_rules
+        WHERE version = (SELECT MAX(version) FROM scoring_rules)
+    """)
+    rows = cursor.fetchall()
+    if not rows:
+        return 1, dict(DEFAULT_MULTIPLIERS)
+    return rows[0][0], {difficulty: multiplier for _, difficulty, multiplier in rows}
+
+def get_scoring_rules(version=None):
+    """Return (version, {difficulty: multiplier}) for a version, or the current one."""
+    conn = get_connection()
+    cursor = conn.cursor()
+    if version is None:
+        result = _current_scoring_rules(cursor)
+    else:
+        cursor.execute("SELECT difficulty, multiplier FROM scoring_rules WHERE version=?", (version,))
+        rows = cursor.fetchall()
+        result = (version, dict(rows)) if rows else None
+    conn.close()
+    return result
+
+def add_scoring_rules(multipliers):
+    """
+    Store a new version of the multipliers and make it current.
+    `multipliers` must give an integer for every difficulty.
+    Returns the new version number. Existing scores are unchanged until
+    recompute_scores() is run.
+    """
+    missing = [d for d in DEFAULT_MULTIPLIERS if d not in multipliers]
+    if missing:
+        raise ValueError(f"Missing multiplier(s) for: {', '.join(missing)}")
+    conn = get_connection()
+    cursor = conn.cursor()
+    cursor.execute("SELECT COALESCE(MAX(version), 0) + 1 FROM scoring_rules")
+    version = cursor.fetchone()[0]
+    cursor.executemany(
+        "INSERT INTO scoring_rules (version, difficulty, multiplier) VALUES (?,?,?)",
+        [(version, d, int(multipliers[d])) for d in DEFAULT_MULTIPLIERS]
     )
     conn.commit()
     conn.close()
+    return version
 
-def get_leaderboard(top_n=10):
-    """Return a list of top sessions (name, difficulty, catches, score)."""
+def recompute_scores(version=None, chunk_size=50000, pause=0.01, progress=None):
+    """
+    Rescore every session not already scored with `version` (default: current).
+    Works through session_id ranges of `chunk_size` rows, one set-based UPDATE
+    and one short transaction per range, pausing between ranges so the app's
+    own writes are never held up for long.
+    `progress(done_up_to_session_id, max_session_id)` is called after each range.
+    Returns the number of sessions rescored.
+    """
+    conn = get_connection()
+    cursor = conn.cursor()
+    try:
+        if version is None:
+            version, _ = _current_scoring_rules(cursor)
+        cursor.execute("SELECT COUNT(*) FROM scoring_rules WHERE version=?", (version,))
+        if cursor.fetchone()[0] == 0:
+            raise ValueError(f"Unknown scoring rules version: {version}")
+
+        cursor.execute("SELECT COALESCE(MIN(session_id), 0), COALESCE(MAX(session_id), 0) FROM sessions")
+        low, high = cursor.fetchone()
+        updated = 0
+        start = low - 1
+        while start < high:
+            end = start + chunk_size
+            before = _begin_write(conn)
+            cursor.execute("""
+                SELECT DISTINCT player_id FROM sessions
+                WHERE session_id > ? AND session_id <= ? AND rule_version IS NOT ?
+            """, (start, end, version))
+            player_ids = [row[0] for row in cursor.fetchall()]
+            cursor.execute("""
+                UPDATE sessions
+                SET score = catches * (SELECT r.multiplier FROM scoring_rules r
+                                       WHERE r.version = ? AND r.difficulty = sessions.difficulty),
+                    rule_version = ?
+                WHERE session_id > ? AND session_id <= ?
+                  AND rule_version IS NOT ?
+            """, (version, version, start, end, version))
+            updated += cursor.rowcount
+            if player_ids:
+                _stamp_changes(cursor, "sessions", player_ids)
+            _commit_write(conn, before)
+            start = end
+            if progress:
+                progress(min(end, high), high)
+            if pause:
+                time.sleep(pause)
+        if updated:
+            _refresh_player_best(cursor)
+            conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+    if updated:
+        _notify("sessions")
+    return updated
+
+def get_session(session_id):
+    """Return (player_id, difficulty, catches, score, played_at) for one session, or None."""
     conn = get_connection()
     cursor = conn.cursor()
     cursor.execute("""
-        SELECT p.name, s.difficulty, s.catches, s.score
-        FROM sessions s
-        JOIN players p ON p.player_id = s.player_id
-        ORDER BY s.score DESC
-        LIMIT ?
-    """, (top_n,))
-    rows = cursor.fetchall()
+        SELECT player_id, difficulty, catches, score, played_at
+        FROM sessions
+        WHERE session_id=?
+    """, (session_id,))
+    row = cursor.fetchone()
     conn.close()
-    return rows
+    return row
+
+def get_leaderboard(top_n=10, best_per_player=False):
+    """
+    Return a list of top sessions (name, difficulty, catches, score).
+    With best_per_player, each player appears once, with their best session.
+    """
+    return [row[1:] for row in get_leaderboard_page(None, top_n, best_per_player)]
 
 def get_player_sessions(player_id):
     """Return all sessions for a given player."""
@@ -138,6 +835,128 @@ def get_player_sessions(player_id):
     conn.close()
     return rows
 
+# ---------------------------
+# Keyset Pagination
+# ---------------------------
+# Pages are fetched "after" the last row of the previous page instead of with
+# OFFSET, so every page costs the same no matter how deep the user scrolls.
+# Pass the cursor of the last row you received (or None for the first page).
+
+def get_player_sessions_page(player_id, after=None, limit=50):
+    """
+    Return one page of a player's sessions, oldest first.
+    Rows are (session_id, difficulty, catches, score, played_at).
+    `after` is the (played_at, session_id) of the last row of the previous page.
+    """
+    conn = get_connection()
+    cursor = conn.cursor()
+    if after is None:
+        cursor.execute("""
+            SELECT session_id, difficulty, catches, score, played_at
+            FROM sessions
+            WHERE player_id=?
+            ORDER BY played_at ASC, session_id ASC
+            LIMIT ?
+        """, (player_id, limit))
+    else:
+        cursor.execute("""
+            SELECT session_id, difficulty, catches, score, played_at
+            FROM sessions
+            WHERE player_id=? AND (played_at, session_id) > (?, ?)
+            ORDER BY played_at ASC, session_id ASC
+            LIMIT ?
+        """, (player_id, after[0], after[1], limit))
+    rows = cursor.fetchall()
+    conn.close()
+    return rows
+
+def get_leaderboard_page(after=None, limit=50, best_per_player=False):
+    """
+    Return one page of the full leaderboard, best score first.
+    Rows are (session_id, name, difficulty, catches, score).
+    `after` is the (score, session_id) of the last row of the previous page.
+    Ties on score are broken by the most recent session first.
+    With best_per_player, pages are read from player_best: one row per player.
+    Archived players are left out.
+    """
+    if best_per_player:
+        # player_best never holds archived players
+        source = "player_best b JOIN sessions s ON s.session_id = b.session_id"
+        key = "b"
+        where = ""
+    else:
+        source = "sessions s"
+        key = "s"
+        where = "WHERE p.archived_at IS NULL"
+    if after is not None:
+        where += " AND " if where else "WHERE "
+        where += f"({key}.score, {key}.session_id) < (?, ?)"
+    params = (after[0], after[1], limit) if after is not None else (limit,)
+
+    conn = get_connection()
+    cursor = conn.cursor()
+    cursor.execute(f"""
+        SELECT s.session_id, p.name, s.difficulty, s.catches, s.score
+        FROM {source}
+        JOIN players p ON p.player_id = s.player_id
+        {where}
+        ORDER BY {key}.score DESC, {key}.session_id DESC
+        LIMIT ?
+    """, params)
+    rows = cursor.fetchall()
+    conn.close()
+    return rows
+
+# ---------------------------
+# Trend Aggregation
+# ---------------------------
+# SQL expression giving the first day of the bucket a session falls into
+TREND_BUCKETS = {
+    "day": "date(played_at)",
+    "week": "date(played_at, '-6 days', 'weekday 1')",  # Monday of that week
+    "month": "date(played_at, 'start of month')",
+}
+
+def get_player_bucket_counts(player_id):
+    """
+    Return how many points a player's chart would have at each resolution:
+    {"sessions": N, "day": D, "week": W, "month": M}, computed in one pass.
+    """
+    conn = get_connection()
+    cursor = conn.cursor()
+    cursor.execute(f"""
+        SELECT COUNT(*),
+               COUNT(DISTINCT {TREND_BUCKETS['day']}),
+               COUNT(DISTINCT {TREND_BUCKETS['week']}),
+               COUNT(DISTINCT {TREND_BUCKETS['month']})
+        FROM sessions
+        WHERE player_id=?
+    """, (player_id,))
+    row = cursor.fetchone()
+    conn.close()
+    return {"sessions": row[0], "day": row[1], "week": row[2], "month": row[3]}
+
+def get_player_trend(player_id, bucket="day"):
+    """
+    Return a player's scores aggregated per day, week or month, oldest first.
+    Rows are (bucket_start 'YYYY-MM-DD', sessions, min_score, avg_score, max_score).
+    """
+    if bucket not in TREND_BUCKETS:
+        raise ValueError(f"Unknown bucket: '{bucket}'")
+    expr = TREND_BUCKETS[bucket]
+    conn = get_connection()
+    cursor = conn.cursor()
+    cursor.execute(f"""
+        SELECT {expr} AS bucket_start, COUNT(*), MIN(score), AVG(score), MAX(score)
+        FROM sessions
+        WHERE player_id=?
+        GROUP BY bucket_start
+        ORDER BY bucket_start ASC
+    """, (player_id,))
+    rows = cursor.fetchall()
+    conn.close()
+    return rows
+
 
 def export_to_csv():
     """
@@ -191,7 +1010,7 @@ def export_to_csv():
     local_file = unique_name(local_dir)
     with open(local_file, mode='w', newline='', encoding='utf-8') as f:
         writer = csv.writer(f)
-        writer.writerow(["Player", "Difficulty", "Position", "Side", "Flags", "Score", "Date"])
+        writer.writerow(SESSION_CSV_HEADER)
         writer.writerows(rows)
 
     # Write to OneDrive if available
@@ -201,7 +1020,7 @@ def export_to_csv():
         try:
             with open(onedrive_file, mode='w', newline='', encoding='utf-8') as f:
                 writer = csv.writer(f)
-                writer.writerow(["Player", "Difficulty", "Position", "Side", "Flags", "Score", "Date"])
+                writer.writerow(SESSION_CSV_HEADER)
                 writer.writerows(rows)
         except Exception:
             onedrive_file = None  # In case of error writing
@@ -216,12 +1035,15 @@ def export_to_csv():
 def import_from_csv(path: str):
     """
     Imports players from a CSV with 'name', 'position', and 'side' columns.
-    All column names are case-insensitive.
-    Returns: {"imported": N, "skipped": M, "errors": [(line_no, message), ...]}.
+    All column names are case-insensitive. Names already in the database are
+    left as they are and counted as duplicates; archived players are restored.
+    Returns: {"imported": N, "skipped": M, "duplicates": D, "errors": [(line_no, message), ...]},
+    the same summary as import_sessions_from_csv.
     """
     import csv
 
-    imported, skipped = 0, 0
+    imported, skipped, duplicates = 0, 0, 0
+    restored = []
     errors = []
 
     with open(path, newline="", encoding="utf-8-sig") as f:
@@ -236,38 +1058,258 @@ def import_from_csv(path: str):
 
         conn = get_connection()
         cur = conn.cursor()
+        try:
+            before = _begin_write(conn)
 
-        line_no = 1
-        for row in reader:
-            line_no += 1
-            try:
-                name = (row.get(hmap["name"]) or "").strip()
-                position = (row.get(hmap.get("position", ""), "") or "").strip()
-                side = (row.get(hmap.get("side", ""), "") or "").strip().title()
+            line_no = 1
+            for row in reader:
+                line_no += 1
+                try:
+                    name = (row.get(hmap["name"]) or "").strip()
+                    position = (row.get(hmap.get("position", ""), "") or "").strip()
+                    side = (row.get(hmap.get("side", ""), "") or "").strip().title()
 
-                if not name:
-                    skipped += 1
-                    errors.append((line_no, "Missing 'name'"))
-                    continue
+                    if not name:
+                        skipped += 1
+                        errors.append((line_no, "Missing 'name'"))
+                        continue
 
-                # Optional validation for side
-                if side and side not in ["Offense", "Defense", "Special Teams"]:
+                    # Optional validation for side
+                    if side and side not in ["Offense", "Defense", "Special Teams"]:
+                        skipped += 1
+                        errors.append((line_no, f"Invalid side: '{side}'"))
+                        continue
+
+                    # Insert player
+                    cur.execute("""
+                        INSERT OR IGNORE INTO players (name, position, side)
+                        VALUES (?, ?, ?)
+                    """, (name, position or None, side or None))
+                    if cur.rowcount == 0:
+                        cur.execute("SELECT player_id, archived_at FROM players WHERE name = ?", (name,))
+                        pid, archived_at = cur.fetchone()
+                        if archived_at is None:
+                            skipped += 1
+                            duplicates += 1
+                            continue
+                        cur.execute("UPDATE players SET archived_at = NULL WHERE player_id = ?", (pid,))
+                        restored.append(pid)
+
+                    imported += 1
+
+                except Exception as row_err:
                     skipped += 1
-                    errors.append((line_no, f"Invalid side: '{side}'"))
-                    continue
+                    errors.append((line_no, str(row_err)))
 
-                # Insert player
-                cur.execute("""
-                    INSERT OR IGNORE INTO players (name, position, side)
-                    VALUES (?, ?, ?)
-                """, (name, position or None, side or None))
+            if restored:
+                _refresh_player_best(cur, restored)
+            _commit_write(conn, before)
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            conn.close()
+    if imported:
+        _notify("players")
+    return {
+        "imported": imported,
+        "skipped": skipped,
+        "duplicates": duplicates,
+        "errors": errors,
+    }
 
-                imported += 1
 
-            except Exception as row_err:
-                skipped += 1
-                errors.append((line_no, str(row_err)))
+# ---------------------------
+# Session CSV Import
+# ---------------------------
+# Date formats accepted in the 'Date' column; the first is what export_to_csv
+# writes, the others are what spreadsheet programs tend to turn it into.
+SESSION_DATE_FORMATS = ("%Y-%m-%d %H:%M:%S", "%Y-%m-%d %H:%M", "%m/%d/%Y %H:%M:%S", "%m/%d/%Y %H:%M")
 
-    conn.commit()
-    conn.close()
-    return True
+def _session_hash(name, difficulty, catches, played_at):
+    """
+    Content hash identifying a session independently of its row id. The score
+    is left out: it is derived from the other columns and changes whenever
+    sessions are rescored with new rules.
+    """
+    key = "\x1f".join((name, difficulty, str(catches), played_at))
+    return hashlib.sha1(key.encode("utf-8")).hexdigest()
+
+def _hash_sessions(conn, where):
+    """Set content_hash from the current content of the sessions matching `where`."""
+    conn.create_function("session_hash", 4, _session_hash, deterministic=True)
+    conn.execute(f"""
+        UPDATE sessions
+        SET content_hash = session_hash(
+            (SELECT name FROM players p WHERE p.player_id = sessions.player_id),
+            difficulty, catches, played_at)
+        WHERE {where}
+    """)
+
+def is_session_csv(path):
+    """True if the CSV header looks like an export_to_csv session file."""
+    with open(path, newline="", encoding="utf-8-sig") as f:
+        header = next(csv.reader(f), None) or []
+    columns = {h.lower().strip() for h in header}
+    return {"player", "difficulty", "flags", "score", "date"} <= columns
+
+def _parse_session_chunk(first_line_no, lines, hmap):
+    """
+    Parse a chunk of session CSV lines (runs in a worker process).
+    Returns (rows, errors) where rows are
+    (name, position, side, difficulty, catches, score, played_at, content_hash).
+    """
+    rows, errors = [], []
+    for line_no, record in enumerate(csv.reader(lines), start=first_line_no):
+        if not any(field.strip() for field in record):
+            continue
+        try:
+            def col(key):
+                idx = hmap.get(key)
+                return record[idx].strip() if idx is not None and idx < len(record) else ""
+
+            name = col("player")
+            difficulty = col("difficulty").title()
+            position = col("position")
+            side = col("side").title()
+
+            if not name:
+                errors.append((line_no, "Missing 'Player'"))
+                continue
+            if difficulty not in ["Easy", "Medium", "Hard", "Very Hard"]:
+                errors.append((line_no, f"Invalid difficulty: '{difficulty}'"))
+                continue
+            if side and side not in ["Offense", "Defense", "Special Teams"]:
+                errors.append((line_no, f"Invalid side: '{side}'"))
+                continue
+
+            catches = int(col("flags"))
+            score = int(col("score"))
+
+            raw_date = col("date")
+            for fmt in SESSION_DATE_FORMATS:
+                try:
+                    played_at = datetime.strptime(raw_date, fmt).strftime("%Y-%m-%d %H:%M:%S")
+                    break
+                except ValueError:
+                    pass
+            else:
+                errors.append((line_no, f"Invalid date: '{raw_date}'"))
+                continue
+
+            rows.append((name, position or None, side or None, difficulty, catches, score, played_at,
+                         _session_hash(name, difficulty, catches, played_at)))
+        except Exception as row_err:
+            errors.append((line_no, str(row_err)))
+    return rows, errors
+
+def import_sessions_from_csv(path: str, workers=None, chunk_size=20000, batch_size=5000):
+    """
+    Imports historical sessions from a CSV in the export_to_csv format
+    (Player, Difficulty, Position, Side, Flags, Score, Date).
+    Chunks of the file are parsed in parallel on a process pool. Unknown players
+    are created, and rows that are already in the database (same player, difficulty,
+    flags and date; the score may differ after a rescore) are skipped using a content hash.
+    Everything is written in a single transaction.
+    Returns: {"imported": N, "skipped": M, "duplicates": D, "errors": [(line_no, message), ...]}.
+    Note: quoted fields spanning several lines are not supported.
+    """
+    with open(path, newline="", encoding="utf-8-sig") as f:
+        header = next(csv.reader([f.readline()]), None)
+        if not header:
+            raise ValueError("CSV has no header row.")
+
+        # Map lowercase field names to column indexes
+        hmap = {h.lower().strip(): i for i, h in enumerate(header)}
+        missing = [c for c in ("player", "difficulty", "flags", "score", "date") if c not in hmap]
+        if missing:
+            raise ValueError(f"CSV is missing column(s): {', '.join(missing)}")
+
+        chunks = []
+        line_no = 2
+        while True:
+            lines = list(itertools.islice(f, chunk_size))
+            if not lines:
+                break
+            chunks.append((line_no, lines))
+            line_no += len(lines)
+
+    # Parse (in parallel when there is more than one chunk)
+    if len(chunks) <= 1 or workers == 1:
+        results = [_parse_session_chunk(start, lines, hmap) for start, lines in chunks]
+    else:
+        # spawn, not fork: the GUI process may already be running threads
+        ctx = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(max_workers=workers, mp_context=ctx) as pool:
+            results = list(pool.map(_parse_session_chunk,
+                                    [start for start, _ in chunks],
+                                    [lines for _, lines in chunks],
+                                    itertools.repeat(hmap)))
+
+    errors = []
+    rows = []
+    seen = set()
+    in_file_duplicates = 0
+    for chunk_rows, chunk_errors in results:
+        errors.extend(chunk_errors)
+        for row in chunk_rows:
+            if row[7] in seen:
+                in_file_duplicates += 1
+                continue
+            seen.add(row[7])
+            rows.append(row)
+
+    conn = get_connection()
+    cur = conn.cursor()
+    try:
+        before = _begin_write(conn)
+        # Hash any rows recorded since the last import so they can be matched
+        _hash_sessions(conn, "content_hash IS NULL")
+
+        # Resolve player names to ids in bulk, creating players we have not seen
+        cur.execute("SELECT name, player_id FROM players")
+        player_ids = dict(cur.fetchall())
+        new_players = {}
+        for name, position, side, *_ in rows:
+            if name not in player_ids:
+                new_players.setdefault(name, (position, side))
+        if new_players:
+            cur.executemany(
+                "INSERT INTO players (name, position, side) VALUES (?,?,?)",
+                [(name, position, side) for name, (position, side) in new_players.items()]
+            )
+            cur.execute("SELECT name, player_id FROM players")
+            player_ids = dict(cur.fetchall())
+
+        imported = 0
+        for i in range(0, len(rows), batch_size):
+            batch = [
+                (player_ids[name], difficulty, catches, score, played_at, digest, digest)
+                for name, _, _, difficulty, catches, score, played_at, digest in rows[i:i + batch_size]
+            ]
+            cur.executemany("""
+                INSERT INTO sessions (player_id, difficulty, catches, score, played_at, content_hash)
+                SELECT ?, ?, ?, ?, ?, ?
+                WHERE NOT EXISTS (SELECT 1 FROM sessions WHERE content_hash = ?)
+            """, batch)
+            imported += cur.rowcount
+        if imported:
+            _refresh_player_best(cur, {player_ids[row[0]] for row in rows})
+        _commit_write(conn, before)
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+    if new_players:
+        _notify("players")
+    if imported:
+        _notify("sessions")
+
+    duplicates = in_file_duplicates + len(rows) - imported
+    return {
+        "imported": imported,
+        "skipped": len(errors) + duplicates,
+        "duplicates": duplicates,
+        "errors": sorted(errors),
+    }
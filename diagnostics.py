@@ -0,0 +1,238 @@
+"""
+Field diagnostics for the kiosk, started from the admin panel.
+
+SamplingProfiler samples the GUI thread's Python stack every few ms from a
+background thread (sys._current_frames), so it costs the kiosk next to
+nothing and needs no restart. It writes:
+    profile-<time>.folded  one "outer;...;inner count" line per stack, for
+                           flamegraph.pl, speedscope or inferno
+    profile-<time>.txt     the functions with the most samples, by self and total
+Samples taken while the GUI thread is idle in the Qt event loop show up as
+bare <module> (or whatever called app.exec()).
+
+MemoryTracker runs tracemalloc and takes a snapshot every few minutes, writing
+memory-<time>.txt with the allocation sites that grew since the first and the
+previous snapshot, and memory-<time>.tracemalloc (Snapshot.dump) for offline
+digging:
+    import tracemalloc
+    old = tracemalloc.Snapshot.load("diagnostics/memory-...-1.tracemalloc")
+    new = tracemalloc.Snapshot.load("diagnostics/memory-...-5.tracemalloc")
+    for stat in new.compare_to(old, "traceback")[:5]:
+        print(stat, *stat.traceback.format(), sep="\\n")
+tracemalloc slows allocations down noticeably; stop it when done.
+
+Both write to a diagnostics folder next to the database file (like the
+backups and the touch log) unless given an out_dir.
+"""
+import linecache
+import logging
+import os
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from datetime import datetime
+from pathlib import Path
+
+import database_setup as db
+
+log = logging.getLogger(__name__)
+
+DIAGNOSTICS_DIR = "diagnostics"
+TOP_LINES = 30
+
+# tracemalloc is process-wide: a new tracker waits for the last one to finish
+_tracing = threading.Lock()
+
+
+def _stamp():
+    return datetime.now().strftime("%Y%m%d-%H%M%S")
+
+
+def diagnostics_dir():
+    """The default output folder: DIAGNOSTICS_DIR next to the configured database."""
+    return Path(os.path.dirname(os.path.abspath(db.DB_FILE))) / DIAGNOSTICS_DIR
+
+
+# ==============================
+# CPU profile
+# ==============================
+class SamplingProfiler:
+    """Samples one thread's stack (default: the calling thread) until stop()."""
+
+    def __init__(self, out_dir=None, interval=0.005, thread_ident=None):
+        self.out_dir = Path(out_dir) if out_dir else None
+        self.interval = interval
+        self.thread_ident = thread_ident
+        self.stacks = Counter()
+        self.samples = 0
+        self._labels = {}                  # code object -> "file.py:function"
+        self._stop = threading.Event()
+        self._thread = None
+        self._started = None
+
+    @property
+    def running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self):
+        if self.running:
+            return
+        if self.thread_ident is None:
+            self.thread_ident = threading.get_ident()
+        if self.out_dir is None:
+            self.out_dir = diagnostics_dir()
+        self.stacks.clear()
+        self.samples = 0
+        self._stop.clear()
+        self._started = time.perf_counter()
+        self._thread = threading.Thread(target=self._run, name="sampling-profiler", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Stop sampling and write the profile. Returns the .folded path (None if nothing was sampled)."""
+        if self._thread is None:
+            return None
+        self._stop.set()
+        self._thread.join()
+        self._thread = None
+        if not self.samples:
+            return None
+        return self.write(time.perf_counter() - self._started)
+
+    def _run(self):
+        ident = self.thread_ident
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(ident)
+            if frame is None:
+                break
+            self.stacks[self._fold(frame)] += 1
+            self.samples += 1
+
+    def _fold(self, frame):
+        labels = self._labels
+        names = []
+        while frame is not None:
+            code = frame.f_code
+            label = labels.get(code)
+            if label is None:
+                label = labels[code] = f"{os.path.basename(code.co_filename)}:{code.co_name}"
+            names.append(label)
+            frame = frame.f_back
+        return ";".join(reversed(names))
+
+    def write(self, seconds):
+        self.out_dir.mkdir(parents=True, exist_ok=True)
+        base = self.out_dir / f"profile-{_stamp()}"
+        folded = base.with_suffix(".folded")
+        with open(folded, "w", encoding="utf-8") as f:
+            for stack, count in self.stacks.most_common():
+                f.write(f"{stack} {count}\n")
+
+        own, total = Counter(), Counter()
+        for stack, count in self.stacks.items():
+            frames = stack.split(";")
+            own[frames[-1]] += count
+            for name in set(frames):
+                total[name] += count
+        with open(base.with_suffix(".txt"), "w", encoding="utf-8") as f:
+            f.write(f"{self.samples} samples every {self.interval * 1000:g} ms over {seconds:.1f} s\n")
+            for title, counter in (("Self", own), ("Total (self + callees)", total)):
+                f.write(f"\n{title}:\n")
+                for name, count in counter.most_common(TOP_LINES):
+                    f.write(f"{count / self.samples:7.1%} {count:8d}  {name}\n")
+        log.info("Wrote CPU profile (%d samples) to %s", self.samples, folded)
+        return folded
+
+
+# ==============================
+# Memory growth
+# ==============================
+class MemoryTracker:
+    """tracemalloc snapshots every `interval` seconds, each diffed against the first and the last."""
+
+    def __init__(self, out_dir=None, interval=600, frames=10):
+        self.out_dir = Path(out_dir) if out_dir else None
+        self.interval = interval
+        self.frames = frames
+        self.count = 0
+        self._baseline = None
+        self._previous = None
+        self._stamp = None
+        self._stop = threading.Event()
+        self._thread = None
+
+    @property
+    def running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self):
+        if self.running:
+            return
+        self.count = 0
+        self._baseline = self._previous = None
+        self._stamp = _stamp()
+        if self.out_dir is None:
+            self.out_dir = diagnostics_dir()
+        self._stop.clear()
+        # Snapshots are taken and compared on this thread, never the GUI thread
+        self._thread = threading.Thread(target=self._run, name="memory-tracker", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Take a last snapshot, then stop tracemalloc (done on the tracker thread)."""
+        self._stop.set()
+
+    def _run(self):
+        with _tracing:
+            tracemalloc.start(self.frames)
+            try:
+                self.snapshot()
+                while not self._stop.wait(self.interval):
+                    self.snapshot()
+                self.snapshot()
+            except Exception:
+                log.exception("Memory tracking failed")
+            finally:
+                tracemalloc.stop()
+                self._baseline = self._previous = None
+
+    def snapshot(self):
+        """Take, compare and write one snapshot. Returns the report path."""
+        snapshot = tracemalloc.take_snapshot().filter_traces((
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            # Source lines cached while formatting earlier reports
+            tracemalloc.Filter(False, linecache.__file__),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap*>"),
+            tracemalloc.Filter(False, "<unknown>"),
+        ))
+        current, peak = tracemalloc.get_traced_memory()
+        self.count += 1
+        self.out_dir.mkdir(parents=True, exist_ok=True)
+        base = self.out_dir / f"memory-{self._stamp}-{self.count}"
+        snapshot.dump(str(base.with_suffix(".tracemalloc")))
+
+        report = base.with_suffix(".txt")
+        with open(report, "w", encoding="utf-8") as f:
+            f.write(f"Snapshot {self.count} at {datetime.now():%Y-%m-%d %H:%M:%S}: "
+                    f"{current / 2**20:.1f} MiB traced, peak {peak / 2**20:.1f} MiB\n")
+            if self._baseline is None:
+                f.write("\nFirst snapshot; later ones are compared with it.\n")
+                stats = snapshot.statistics("lineno")[:TOP_LINES]
+                f.write("\nLargest allocation sites:\n")
+                f.writelines(f"{stat}\n" for stat in stats)
+            else:
+                for title, old in (("Since the first snapshot", self._baseline),
+                                   ("Since the previous snapshot", self._previous)):
+                    f.write(f"\n{title}:\n")
+                    f.writelines(f"{stat}\n" for stat in snapshot.compare_to(old, "lineno")[:TOP_LINES])
+                f.write("\nTop growth since the first snapshot, with call stacks:\n")
+                for stat in snapshot.compare_to(self._baseline, "traceback")[:5]:
+                    f.write(f"\n{stat}\n")
+                    f.writelines(f"{line}\n" for line in stat.traceback.format())
+        if self._baseline is None:
+            self._baseline = snapshot
+        self._previous = snapshot
+        log.info("Wrote memory snapshot %d to %s", self.count, report)
+        return report
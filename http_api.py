@@ -0,0 +1,327 @@
+"""
+Read-only HTTP API for coaches' dashboards.
+
+    GET /leaderboard?limit=25&best=1
+    GET /players
+    GET /players/<player_id>
+    GET /players/<player_id>/sessions?limit=200&after_played_at=...&after_session_id=...
+
+Responses are JSON with an ETag; send it back in If-None-Match to get a 304
+when nothing changed. The server runs an asyncio loop on its own thread, so
+requests never touch the GUI thread. Bodies are cached per URL and dropped
+by database_setup's change notifications, so a dashboard polling every few
+seconds costs no queries between rounds. Cache misses are read on a single
+worker thread through ordinary WAL read transactions, which never block the
+kiosk's round writes.
+
+Start it with the kiosk: `python qt6_app.py --http-port 8080`. It has to run
+in the kiosk's process, because that is where the change notifications come
+from.
+"""
+import asyncio
+import hashlib
+import json
+import logging
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from http import HTTPStatus
+from urllib.parse import parse_qs, urlsplit
+
+import database_setup as db
+
+log = logging.getLogger(__name__)
+
+MAX_LEADERBOARD_ROWS = 200
+MAX_SESSION_ROWS = 1000
+CACHE_ENTRIES = 256
+REQUEST_TIMEOUT = 15      # seconds to wait for a request (or the next one on a kept-alive connection)
+
+# Which cached responses each kind of change makes stale
+_STALE_SECTIONS = {
+    "sessions": {"leaderboard", "sessions"},
+    "players": {"leaderboard", "players", "player", "sessions"},
+}
+
+
+class NotFound(Exception):
+    pass
+
+
+class ApiServer:
+    """
+    Serves the API on (host, port) from a background thread. Call start()
+    once the database is configured, stop() on shutdown.
+    """
+
+    def __init__(self, host="0.0.0.0", port=8080):
+        self.host = host
+        self.port = port
+        self._cache = OrderedDict()          # (section, key) -> (etag, body)
+        self._cache_lock = threading.Lock()
+        self._generation = 0                 # bumped on every change, so late reads are not cached
+        self._reader = ThreadPoolExecutor(max_workers=1, thread_name_prefix="http-api-db")
+        self._pending = {}                   # (section, key) -> future, to share one read between requests
+        self._connections = {}               # handler task -> writer, closed on stop()
+        self._loop = None
+        self._stopping = None
+        self._thread = None
+        self._started = threading.Event()
+        self._listener = None
+
+    # --------------------------
+    # Lifecycle
+    # --------------------------
+    def start(self):
+        if self._thread and self._thread.is_alive():
+            return
+        self._listener = db.subscribe(self._on_change)
+        self._started.clear()
+        self._thread = threading.Thread(target=self._run, name="http-api", daemon=True)
+        self._thread.start()
+        self._started.wait(5)
+
+    def stop(self, timeout=5):
+        if self._listener:
+            db.unsubscribe(self._listener)
+            self._listener = None
+        if self._loop and self._stopping:
+            self._loop.call_soon_threadsafe(self._stopping.set)
+        if self._thread:
+            self._thread.join(timeout)
+        self._reader.shutdown(wait=False)
+
+    def _run(self):
+        try:
+            asyncio.run(self._serve())
+        except Exception:
+            log.exception("HTTP API stopped")
+        finally:
+            self._started.set()
+
+    async def _serve(self):
+        self._loop = asyncio.get_running_loop()
+        self._stopping = asyncio.Event()
+        server = await asyncio.start_server(self._handle_connection, self.host, self.port)
+        # Port 0 picks a free port; report the real one
+        self.port = server.sockets[0].getsockname()[1]
+        log.info("HTTP API listening on %s:%s", self.host, self.port)
+        self._started.set()
+        async with server:
+            await self._stopping.wait()
+        # Let kept-alive connections see EOF and finish instead of being cancelled
+        for writer in self._connections.values():
+            writer.close()
+        await asyncio.gather(*self._connections, return_exceptions=True)
+
+    # --------------------------
+    # Cache
+    # --------------------------
+    def _on_change(self, kind, ids):
+        """Change listener; runs on the writer's thread, so only drops entries."""
+        stale = _STALE_SECTIONS.get(kind, ())
+        with self._cache_lock:
+            self._generation += 1
+            for key in [key for key in self._cache if key[0] in stale]:
+                del self._cache[key]
+
+    async def _cached(self, section, key, query):
+        """Return (etag, body) for a query, from the cache or one worker-thread read."""
+        cache_key = (section, key)
+        with self._cache_lock:
+            hit = self._cache.get(cache_key)
+            if hit is not None:
+                self._cache.move_to_end(cache_key)
+                return hit
+            generation = self._generation
+
+        future = self._pending.get(cache_key)
+        if future is None:
+            future = self._loop.run_in_executor(self._reader, _render, query)
+            self._pending[cache_key] = future
+            try:
+                entry = await future
+            finally:
+                self._pending.pop(cache_key, None)
+            with self._cache_lock:
+                # A change since the read started may have made it stale already
+                if generation == self._generation:
+                    self._cache[cache_key] = entry
+                    while len(self._cache) > CACHE_ENTRIES:
+                        self._cache.popitem(last=False)
+            return entry
+        return await future
+
+    # --------------------------
+    # HTTP
+    # --------------------------
+    async def _handle_connection(self, reader, writer):
+        task = asyncio.current_task()
+        self._connections[task] = writer
+        try:
+            while True:
+                try:
+                    request_line = await asyncio.wait_for(reader.readline(), REQUEST_TIMEOUT)
+                    if not request_line:
+                        break
+                    headers = {}
+                    while True:
+                        line = await asyncio.wait_for(reader.readline(), REQUEST_TIMEOUT)
+                        if line in (b"\r\n", b"\n", b""):
+                            break
+                        name, _, value = line.decode("latin-1").partition(":")
+                        headers[name.strip().lower()] = value.strip()
+                except (asyncio.TimeoutError, asyncio.LimitOverrunError, ValueError):
+                    break
+
+                parts = request_line.decode("latin-1").split()
+                if len(parts) != 3:
+                    await self._respond(writer, HTTPStatus.BAD_REQUEST, _error_body("Malformed request"))
+                    break
+                method, target, version = parts
+                keep_alive = (version == "HTTP/1.1"
+                              and headers.get("connection", "").lower() != "close")
+                await self._dispatch(writer, method, target, headers, keep_alive)
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        except Exception:
+            log.exception("HTTP API request failed")
+        finally:
+            del self._connections[task]
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except ConnectionError:
+                pass
+
+    async def _dispatch(self, writer, method, target, headers, keep_alive):
+        if method not in ("GET", "HEAD"):
+            await self._respond(writer, HTTPStatus.METHOD_NOT_ALLOWED, _error_body("Read-only API"),
+                                keep_alive=keep_alive, extra={"Allow": "GET, HEAD"})
+            return
+        url = urlsplit(target)
+        params = {k: v[-1] for k, v in parse_qs(url.query).items()}
+        try:
+            section, key, query = _route(url.path.rstrip("/") or "/", params)
+            etag, body = await self._cached(section, key, query)
+        except NotFound as ex:
+            await self._respond(writer, HTTPStatus.NOT_FOUND, _error_body(str(ex)), keep_alive=keep_alive)
+            return
+        except ValueError as ex:
+            await self._respond(writer, HTTPStatus.BAD_REQUEST, _error_body(str(ex)), keep_alive=keep_alive)
+            return
+        except Exception:
+            log.exception("HTTP API query failed: %s", target)
+            await self._respond(writer, HTTPStatus.INTERNAL_SERVER_ERROR, _error_body("Query failed"),
+                                keep_alive=keep_alive)
+            return
+
+        if etag in [tag.strip() for tag in headers.get("if-none-match", "").split(",")]:
+            await self._respond(writer, HTTPStatus.NOT_MODIFIED, b"", keep_alive=keep_alive, etag=etag)
+        else:
+            await self._respond(writer, HTTPStatus.OK, body, keep_alive=keep_alive, etag=etag,
+                                head=method == "HEAD")
+
+    async def _respond(self, writer, status, body, keep_alive=False, etag=None, head=False, extra=None):
+        lines = [f"HTTP/1.1 {status.value} {status.phrase}",
+                 "Content-Type: application/json; charset=utf-8",
+                 f"Content-Length: {len(body) if status != HTTPStatus.NOT_MODIFIED else 0}",
+                 "Cache-Control: no-cache",
+                 f"Connection: {'keep-alive' if keep_alive else 'close'}"]
+        if etag:
+            lines.append(f"ETag: {etag}")
+        for name, value in (extra or {}).items():
+            lines.append(f"{name}: {value}")
+        writer.write(("\r\n".join(lines) + "\r\n\r\n").encode("latin-1"))
+        if body and not head and status != HTTPStatus.NOT_MODIFIED:
+            writer.write(body)
+        await writer.drain()
+
+
+# ==============================
+# Routes
+# ==============================
+def _route(path, params):
+    """Map a request to (cache section, cache key, query function)."""
+    parts = path.strip("/").split("/")
+    if parts == ["leaderboard"]:
+        limit = _int_param(params, "limit", 25, MAX_LEADERBOARD_ROWS)
+        best = params.get("best", "0").lower() in ("1", "true", "yes")
+        return "leaderboard", (limit, best), lambda: _leaderboard(limit, best)
+    if parts == ["players"]:
+        return "players", None, _players
+    if len(parts) in (2, 3) and parts[0] == "players":
+        try:
+            player_id = int(parts[1])
+        except ValueError:
+            raise NotFound(f"No such player: {parts[1]}")
+        if len(parts) == 2:
+            return "player", player_id, lambda: _player(player_id)
+        if parts[2] == "sessions":
+            limit = _int_param(params, "limit", 200, MAX_SESSION_ROWS)
+            after = None
+            if "after_session_id" in params:
+                after = (params.get("after_played_at", ""), _int_param(params, "after_session_id", 0, None))
+            return "sessions", (player_id, limit, after), lambda: _sessions(player_id, limit, after)
+    raise NotFound(f"No such resource: {path}")
+
+
+def _int_param(params, name, default, maximum):
+    try:
+        value = int(params.get(name, default))
+    except ValueError:
+        raise ValueError(f"'{name}' must be an integer")
+    if value < 0:
+        raise ValueError(f"'{name}' must not be negative")
+    return min(value, maximum) if maximum is not None else value
+
+
+def _leaderboard(limit, best):
+    rows = db.get_leaderboard_page(None, limit, best)
+    return {
+        "best_per_player": best,
+        "rows": [{"rank": rank, "session_id": session_id, "name": name, "difficulty": difficulty,
+                  "flags": catches, "score": score}
+                 for rank, (session_id, name, difficulty, catches, score) in enumerate(rows, start=1)],
+    }
+
+
+def _players():
+    return [{"player_id": pid, "name": name, "position": position, "side": side}
+            for pid, name, position, side in db.get_all_players()]
+
+
+def _player(player_id):
+    player = db.get_player_by_id(player_id, include_archived=False)
+    if player is None:
+        raise NotFound(f"No such player: {player_id}")
+    return player
+
+
+def _sessions(player_id, limit, after):
+    if db.get_player_by_id(player_id, include_archived=False) is None:
+        raise NotFound(f"No such player: {player_id}")
+    rows = db.get_player_sessions_page(player_id, after, limit)
+    result = {
+        "player_id": player_id,
+        "sessions": [{"session_id": session_id, "difficulty": difficulty, "flags": catches,
+                      "score": score, "played_at": played_at}
+                     for session_id, difficulty, catches, score, played_at in rows],
+        "next": None,
+    }
+    if len(rows) == limit and rows:
+        result["next"] = {"after_played_at": rows[-1][4], "after_session_id": rows[-1][0]}
+    return result
+
+
+def _render(query):
+    """Run a route's query and encode it (worker thread). Returns (etag, body)."""
+    body = json.dumps(query(), separators=(",", ":")).encode("utf-8")
+    return f'"{hashlib.sha1(body).hexdigest()[:20]}"', body
+
+
+def _error_body(message):
+    return json.dumps({"error": message}).encode("utf-8")
+
@@ -0,0 +1,153 @@
+"""
+Idle-time database maintenance for the Flag Reaction Test kiosk.
+
+When no round has been played for a while, refresh the query planner's
+statistics, hand free pages back to the filesystem and check the database for
+corruption. Every step runs in short slices and is interrupted as soon as the
+app reports activity (a new round starting), so maintenance never delays play.
+"""
+import logging
+import sqlite3
+import threading
+import time
+
+import database_setup as db
+
+log = logging.getLogger(__name__)
+
+
+class MaintenanceAborted(Exception):
+    """Raised inside a maintenance run when activity resumes."""
+
+
+class MaintenanceScheduler:
+    """
+    Runs maintenance on a background thread once the kiosk has been idle for
+    `idle_after` seconds, at most once per idle period.
+    Call notify_activity() whenever a round starts or is recorded.
+    """
+
+    def __init__(self, idle_after=600, check_every=30, vacuum_pages=200, slice_pause=0.05):
+        self.idle_after = idle_after
+        self.check_every = check_every
+        self.vacuum_pages = vacuum_pages  # pages released per incremental_vacuum slice
+        self.slice_pause = slice_pause    # pause between slices
+        self._last_activity = time.monotonic()
+        self._ran_since_activity = False
+        self._abort = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+
+    # --------------------------
+    # Scheduling
+    # --------------------------
+    def start(self):
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="db-maintenance", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout=5):
+        self._stop.set()
+        self._abort.set()
+        if self._thread:
+            self._thread.join(timeout)
+
+    def notify_activity(self):
+        """Mark the kiosk busy and abort any maintenance in progress."""
+        self._last_activity = time.monotonic()
+        self._ran_since_activity = False
+        self._abort.set()
+
+    def _run(self):
+        while not self._stop.wait(self.check_every):
+            self._abort.clear()
+            idle_for = time.monotonic() - self._last_activity
+            if idle_for < self.idle_after or self._ran_since_activity:
+                continue
+            try:
+                if self.run_now() is not None:
+                    self._ran_since_activity = True
+            except Exception:
+                log.exception("Database maintenance failed")
+
+    # --------------------------
+    # Maintenance
+    # --------------------------
+    def run_now(self):
+        """
+        Run every maintenance step. Returns a list of (step, seconds, result),
+        or None if the run was aborted by activity.
+        """
+        conn = db.get_connection()
+        conn.isolation_level = None
+        # Checked by SQLite every 1000 VM instructions: interrupts the
+        # running statement as soon as activity is reported
+        conn.set_progress_handler(lambda: 1 if self._abort.is_set() else 0, 1000)
+        report = []
+        started = time.perf_counter()
+        try:
+            for name, step in (("analyze", self._analyze),
+                               ("incremental_vacuum", self._incremental_vacuum),
+                               ("integrity_check", self._integrity_check)):
+                t0 = time.perf_counter()
+                result = step(conn)
+                elapsed = time.perf_counter() - t0
+                log.info("Maintenance step %s took %.3fs: %s", name, elapsed, result)
+                report.append((name, elapsed, result))
+        except (MaintenanceAborted, sqlite3.OperationalError) as ex:
+            if not self._abort.is_set():
+                raise
+            log.info("Maintenance aborted after %.3fs (activity resumed): %s",
+                     time.perf_counter() - started, ex)
+            return None
+        finally:
+            conn.close()
+        log.info("Maintenance finished in %.3fs", time.perf_counter() - started)
+        return report
+
+    def _check_abort(self):
+        if self._abort.is_set():
+            raise MaintenanceAborted("activity resumed")
+        time.sleep(self.slice_pause)
+
+    def _analyze(self, conn):
+        # First run: gather full statistics, one table per slice.
+        # Afterwards PRAGMA optimize only re-analyzes tables that need it.
+        has_stats = conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE name='sqlite_stat1'").fetchone()
+        if has_stats:
+            conn.execute("PRAGMA optimize")
+            return "optimize"
+        tables = [row[0] for row in conn.execute(
+            "SELECT name FROM sqlite_master WHERE type='table' AND name NOT LIKE 'sqlite_%'")]
+        for table in tables:
+            self._check_abort()
+            conn.execute(f'ANALYZE "{table}"')
+        return f"analyzed {len(tables)} tables"
+
+    def _incremental_vacuum(self, conn):
+        mode = conn.execute("PRAGMA auto_vacuum").fetchone()[0]
+        if mode != 2:
+            # Databases created before auto_vacuum was enabled need one full
+            # VACUUM to switch over; it is interruptible like everything else
+            conn.execute("PRAGMA auto_vacuum=INCREMENTAL")
+            conn.execute("VACUUM")
+            return "converted to incremental auto_vacuum"
+        free_before = free = conn.execute("PRAGMA freelist_count").fetchone()[0]
+        while free:
+            self._check_abort()
+            # executescript steps the pragma to completion; a plain execute()
+            # stops after the first page
+            conn.executescript(f"PRAGMA incremental_vacuum({self.vacuum_pages});")
+            free = conn.execute("PRAGMA freelist_count").fetchone()[0]
+        return f"released {free_before - free} pages"
+
+    def _integrity_check(self, conn):
+        self._check_abort()
+        rows = conn.execute("PRAGMA integrity_check").fetchall()
+        result = "; ".join(row[0] for row in rows)
+        if result != "ok":
+            log.error("Database integrity check failed: %s", result)
+        return result
@@ -1,26 +1,36 @@
+import time
+# Launch time, for the time-to-interactive log line (before the heavy imports)
+STARTED = time.perf_counter()
+
+import os
 import sys
+import uuid
+import logging
+import argparse
+from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
 from PyQt6.QtWidgets import (
     QApplication, QWidget, QVBoxLayout, QPushButton, QLabel, QListWidget, QListWidgetItem,
     QStackedWidget, QMessageBox, QInputDialog, QTableWidget, QTableWidgetItem,
-    QHBoxLayout, QGridLayout, QLineEdit, QFileDialog, QDialog, QComboBox
+    QHBoxLayout, QGridLayout, QLineEdit, QFileDialog, QDialog, QComboBox, QAbstractItemView,
+    QHeaderView
 )
-from PyQt6.QtCore import Qt, QEvent, QTimer
+from PyQt6.QtCore import Qt, QEvent, QTimer, pyqtSignal
 from PyQt6.QtGui import QTouchEvent
 import database_setup as db
+from backup import BackupScheduler
+from http_api import ApiServer
+from maintenance import MaintenanceScheduler
+from ui_watchdog import EventLoopWatchdog
+from touch_log import TouchRecorder, KIND_BEGIN, KIND_UPDATE, KIND_END
+from score_chart import CHART_BACKENDS, make_score_chart, preload_chart_backend
+from snapshot import export_snapshot
+from diagnostics import MemoryTracker, SamplingProfiler, diagnostics_dir
 
-import matplotlib.pyplot as plt
-from matplotlib.dates import DateFormatter
-from datetime import datetime
-from matplotlib.backends.backend_qtagg import FigureCanvasQTAgg as FigureCanvas
-from matplotlib.figure import Figure
+from datetime import datetime, timedelta
 
 #from datetime import datetime
 
-# ==============================
-# Initialize Database
-# ==============================
-db.setup_database()
-
 # ==============================
 # Dark Mode Stylesheet
 # ==============================
@@ -32,6 +42,18 @@ QPushButton:pressed { background-color: #2a2a44; }
 QTableWidget { background-color: #2b2b3d; gridline-color: #444466; }
 QHeaderView::section { background-color: #3b3b5c; padding: 4px; font-weight: bold; }
 QListWidget { background-color: #001E44; border-radius: 12px; padding: 6px; font-size: 16px;}
+/* Text roles: set once with setProperty("role", ...) when a screen is built */
+QLabel[role="header"] { font-weight: bold; font-size: 22px; }
+QLabel[role="header"][mode="admin"] { color: orange; }
+QLabel[role="title"] { font-weight: bold; font-size: 20px; }
+QLabel[role="status"] { font-size: 16px; font-weight: bold; margin-top: 10px; }
+QLabel[role="name"] { font-weight: bold; font-size: 24px; }
+QLabel[role="big"] { font-weight: bold; font-size: 48px; }
+#go_screen, #go_screen QLabel { background-color: green; color: white; }
+#player_list { font-size: 20px; font-weight: bold; }
+#player_list::item { padding: 5px 5px; height: 40px; }
+#spectator QTableWidget { font-size: 32px; }
+#spectator QLabel[role="header"] { font-size: 40px; }
 /* Larger Scrollbar */
 QScrollBar:vertical {
     background: #2b2b3d;
@@ -50,12 +72,94 @@ QScrollBar::sub-line:vertical {
 }
 """
 
+# Rows fetched per page by the infinite-scroll tables
+PAGE_SIZE = 25
+
+# Queue mode writes buffered rounds to the database this many at a time
+QUEUE_BATCH_SIZE = 10
+
+# Touches are still recorded this long after the count is entered (finger lift)
+TOUCH_TAIL_MS = 300
+TOUCH_KINDS = {
+    QEvent.Type.TouchBegin: KIND_BEGIN,
+    QEvent.Type.TouchUpdate: KIND_UPDATE,
+    QEvent.Type.TouchEnd: KIND_END,
+}
+
+# One countdown step, and how long GO stays up (the load-test harness shortens it)
+COUNTDOWN_TICK_MS = 1000
+
+# Rows on the spectator leaderboard (--spectator)
+SPECTATOR_ROWS = 10
+
+# How often to look for commits from other processes (db.ChangeWatcher)
+CHANGE_POLL_MS = 1000
+
+# Admin diagnostics defaults: rounds per CPU profile, minutes between memory snapshots
+PROFILE_ROUNDS = 10
+MEMORY_SNAPSHOT_MINUTES = 10
+
+log = logging.getLogger(__name__)
+
+# ==============================
+# Stats Data
+# ==============================
+def load_stats_data(player_id, max_points):
+    """
+    Query everything the stats chart needs for one player. Database only, so it
+    can run on a background thread. Sessions are plotted one by one while they
+    fit in `max_points`, otherwise as per-day/week/month min/mean/max.
+    """
+    counts = db.get_player_bucket_counts(player_id)
+    data = {"player_id": player_id, "sessions": counts["sessions"], "max_points": max_points,
+            "bucket": None, "rendered": False, "patched": set()}
+    if counts["sessions"] <= max_points:
+        sessions = db.get_player_sessions(player_id)
+        scores = [row[2] for row in sessions]
+        data.update(
+            dates=[datetime.strptime(row[3], "%Y-%m-%d %H:%M:%S") for row in sessions],
+            counts=[1] * len(scores), lows=list(scores), means=list(scores), highs=list(scores),
+        )
+    else:
+        bucket = next((b for b in ("day", "week", "month") if counts[b] <= max_points), "month")
+        trend = db.get_player_trend(player_id, bucket)
+        data.update(
+            bucket=bucket,
+            dates=[datetime.strptime(row[0], "%Y-%m-%d") for row in trend],
+            counts=[row[1] for row in trend],
+            lows=[row[2] for row in trend],
+            means=[row[3] for row in trend],
+            highs=[row[4] for row in trend],
+        )
+    return data
+
+def bucket_start(when, bucket):
+    """Python twin of database_setup.TREND_BUCKETS: first day of when's bucket."""
+    day = when.replace(hour=0, minute=0, second=0, microsecond=0)
+    if bucket == "day":
+        return day
+    if bucket == "week":
+        return day - timedelta(days=day.weekday())
+    return day.replace(day=1)
+
 # ==============================
 # Main Application
 # ==============================
 class FlagApp(QWidget):
-    def __init__(self):
+    # Delivers prefetched stats from the worker thread to the GUI thread
+    stats_ready = pyqtSignal(object)
+    # Delivers the startup data (players, first leaderboard page) the same way
+    warm_up_ready = pyqtSignal(object)
+    # Hands a finished CSV/snapshot export back to the GUI thread
+    export_ready = pyqtSignal(object)
+
+    def __init__(self, maintenance=None, watchdog=None, chart_backend=None, touch_log=None):
         super().__init__()
+        # "matplotlib" or "native" (QPainter, much lighter on the kiosk boards)
+        self.chart_backend = chart_backend or os.environ.get("FLAG_CHART_BACKEND", "matplotlib")
+        if self.chart_backend not in CHART_BACKENDS:
+            log.warning("Unknown chart backend %r; using matplotlib", self.chart_backend)
+            self.chart_backend = "matplotlib"
         self.setWindowTitle("Flag Reaction Test (Dark Mode)")
         self.setGeometry(150, 150, 700, 700)
         self.setFixedSize(self.size())
@@ -86,15 +190,69 @@ class FlagApp(QWidget):
 
         self.stats_screen = self.make_stats_screen()
         self.stack.addWidget(self.stats_screen)
+        self.history_screen = self.make_history_screen()
+        self.stack.addWidget(self.history_screen)
+
+        # Screen names show up in the watchdog's transition timings
+        for name in ("start_screen", "player_screen", "round_screen", "leaderboard_screen",
+                     "countdown_screen", "go_screen", "stats_screen", "history_screen"):
+            getattr(self, name).setObjectName(name)
 
         
         # global values as object oriented attributes
         self.current_player = None
         self.selected_difficulty = None
+        # New for every round started; makes repeated writes of one round idempotent
+        self.round_token = None
+        # Leaderboard shows every round, or one best round per player
+        self.best_per_player = False
+
+        # Queue mode: players still to go, and rounds not yet written
+        self.queue = None
+        self.queue_index = 0
+        self.queue_buffer = []
         self.admin_password = 'dan5171'
 
-        self.load_players()
-        self.update_leaderboard()
+        # Idle-time DB maintenance; told about every round so it can back off
+        self.maintenance = maintenance
+        # Optional event-loop stall detector; times every screen switch
+        self.watchdog = watchdog
+        # Optional TouchRecorder for every touch on the count screen
+        self.touch_log = touch_log
+
+        # Stats for the selected player, fetched (and drawn) while they play
+        self.stats_cache = None
+        self.prefetch_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="stats-prefetch")
+        self.stats_ready.connect(self.on_stats_ready)
+
+        # Admin diagnostics (diagnostics.py): CPU profile of the next N rounds,
+        # periodic tracemalloc snapshots
+        self.profiler = None
+        self.profile_rounds_left = 0
+        self.memory_tracker = None
+
+        # Staged startup: the window is built with placeholders and shown, while
+        # the players, the first leaderboard page and the chart backend load on
+        # the worker; on_warm_up_ready fills them in
+        self.interactive = False
+        self.startup_metrics = {"built_ms": (time.perf_counter() - STARTED) * 1000}
+        self.show_placeholders()
+        self.warm_up_ready.connect(self.on_warm_up_ready)
+        self.prefetch_pool.submit(self._warm_up_worker, self.best_per_player)
+
+        # CSV and analytics snapshot exports (seconds on a big history), on
+        # their own worker so they never hold up stats prefetching
+        self.export_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="export")
+        self.export_ready.connect(self.on_export_ready)
+
+        # Commits from other processes (another kiosk, a CLI import, a manual
+        # fix); what it finds is also passed on to subscribe() listeners such
+        # as the spectator window and the HTTP API
+        self.change_watcher = db.ChangeWatcher(publish=True)
+        self.change_watcher.poll()
+        self.change_timer = QTimer(self)
+        self.change_timer.timeout.connect(self.check_for_changes)
+        self.change_timer.start(CHANGE_POLL_MS)
         self.switch_to(self.start_screen)
         self.switch_to_player_mode()
 
@@ -169,23 +327,14 @@ class FlagApp(QWidget):
         # ---------------------------
         self.header_label = QLabel("Select Player")
         self.header_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
-        self.header_label.setStyleSheet("font-weight: bold; font-size: 22px; color: white;")
+        self.header_label.setProperty("role", "header")
         vbox.addWidget(self.header_label)
 
         # ---------------------------
         # Player List (now larger)
         # ---------------------------
         self.player_list = QListWidget()
-        self.player_list.setStyleSheet("""
-        QListWidget {
-            font-size: 20px;
-            font-weight: bold;
-        }
-        QListWidget::item {
-            padding: 5px 5px;
-            height: 40px;
-        }
-        """)
+        self.player_list.setObjectName("player_list")
 
         #self.player_list.setFixedHeight(250)  # ⬅️ Increased height for more visibility
         vbox.addWidget(self.player_list)
@@ -212,15 +361,26 @@ class FlagApp(QWidget):
         vbox.addWidget(self.btn_login_admin)
 
         # ---------------------------
-        # Hidden admin-only buttons (remain for admin mode)
+        # Hidden admin-only buttons (remain for admin mode), in one container
+        # so a mode switch shows or hides a single widget
         # ---------------------------
+        self.admin_buttons = QWidget()
+        admin_box = QVBoxLayout(self.admin_buttons)
+        admin_box.setContentsMargins(0, 0, 0, 0)
+        admin_box.setSpacing(15)
+        vbox.addWidget(self.admin_buttons)
+
         self.btn_create = QPushButton("Add New Player")
         self.btn_create.clicked.connect(self.create_account)
-        vbox.addWidget(self.btn_create)
+        admin_box.addWidget(self.btn_create)
 
-        self.btn_delete = QPushButton("Remove Selected Player")
+        self.btn_delete = QPushButton("Remove Selected Players")
         self.btn_delete.clicked.connect(self.delete_player_from_list)
-        vbox.addWidget(self.btn_delete)
+        admin_box.addWidget(self.btn_delete)
+
+        self.btn_archive = QPushButton("Archive Selected Players")
+        self.btn_archive.clicked.connect(self.archive_players_from_list)
+        admin_box.addWidget(self.btn_archive)
 
         #self.btn_view = QPushButton("View Leaderboard")
         #self.btn_view.clicked.connect(lambda: self.switch_to(self.leaderboard_screen))
@@ -228,15 +388,29 @@ class FlagApp(QWidget):
 
         self.btn_export = QPushButton("Export CSV")
         self.btn_export.clicked.connect(self.export_csv)
-        vbox.addWidget(self.btn_export)
+        admin_box.addWidget(self.btn_export)
 
         self.btn_import = QPushButton("Import CSV")
         self.btn_import.clicked.connect(self.import_csv)
-        vbox.addWidget(self.btn_import)
+        admin_box.addWidget(self.btn_import)
+
+        # Diagnostics, written to ./diagnostics for offline analysis
+        diag_row = QHBoxLayout()
+        self.btn_profile = QPushButton("Profile Next Rounds")
+        self.btn_profile.clicked.connect(self.toggle_profile)
+        diag_row.addWidget(self.btn_profile)
+        self.btn_memory = QPushButton("Start Memory Tracking")
+        self.btn_memory.clicked.connect(self.toggle_memory_tracking)
+        diag_row.addWidget(self.btn_memory)
+        admin_box.addLayout(diag_row)
+
+        self.btn_queue = QPushButton("Queue Mode (Selected Players)")
+        self.btn_queue.clicked.connect(self.start_queue)
+        admin_box.addWidget(self.btn_queue)
 
         self.btn_logout = QPushButton("Logout")
         self.btn_logout.clicked.connect(self.logout_admin)
-        vbox.addWidget(self.btn_logout)
+        admin_box.addWidget(self.btn_logout)
 
         return w
 
@@ -249,7 +423,7 @@ class FlagApp(QWidget):
 
         self.player_label = QLabel("Player: ???")
         self.player_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
-        self.player_label.setStyleSheet("font-weight: bold; font-size: 20px;")
+        self.player_label.setProperty("role", "title")
         vbox.addWidget(self.player_label)
 
         vbox.addWidget(QLabel("Select Difficulty:", alignment=Qt.AlignmentFlag.AlignCenter))
@@ -262,7 +436,7 @@ class FlagApp(QWidget):
 
         self.difficulty_label = QLabel("Selected Mode: None")
         self.difficulty_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
-        self.difficulty_label.setStyleSheet("font-size: 16px; font-weight: bold; margin-top:10px;")
+        self.difficulty_label.setProperty("role", "status")
         vbox.addWidget(self.difficulty_label)
 
         nav = QHBoxLayout()
@@ -285,9 +459,13 @@ class FlagApp(QWidget):
         vbox.setContentsMargins(40, 20, 40, 20)
         vbox.setSpacing(15)
 
+        self.round_player_label = QLabel("")
+        self.round_player_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
+        vbox.addWidget(self.round_player_label)
+
         label = QLabel("How many flags did you catch?")
         label.setAlignment(Qt.AlignmentFlag.AlignCenter)
-        label.setStyleSheet("font-weight: bold; font-size: 20px;")
+        label.setProperty("role", "title")
         vbox.addWidget(label)
 
         grid = QGridLayout()
@@ -324,9 +502,9 @@ class FlagApp(QWidget):
         vbox.addLayout(nav)
 
         # -------- screen header below buttons
-        header = QLabel("Leaderboard (Top 10)")
+        header = QLabel("Leaderboard")
         header.setAlignment(Qt.AlignmentFlag.AlignCenter)
-        header.setStyleSheet("font-weight: bold; font-size: 22px;")
+        header.setProperty("role", "header")
         vbox.addWidget(header)
         
         # -------- leaderboard on bottom
@@ -337,13 +515,22 @@ class FlagApp(QWidget):
         self.table.setColumnWidth(2, 80)
         self.table.horizontalHeader().setStretchLastSection(False)
         self.table.setFixedHeight(400)
+        self.attach_infinite_scroll(self.table, self.load_more_leaderboard)
         vbox.addSpacing(5)
         vbox.addWidget(self.table)
 
+        bottom = QHBoxLayout()
         self.btn_my_stats = QPushButton("My Stats")
         self.btn_my_stats.setMinimumHeight(40)
         self.btn_my_stats.clicked.connect(self.show_player_stats)
-        vbox.addWidget(self.btn_my_stats)
+        bottom.addWidget(self.btn_my_stats)
+
+        # Switch between every round and each player's best round
+        self.btn_board_mode = QPushButton("Best per Player")
+        self.btn_board_mode.setMinimumHeight(40)
+        self.btn_board_mode.clicked.connect(self.toggle_leaderboard_mode)
+        bottom.addWidget(self.btn_board_mode)
+        vbox.addLayout(bottom)
 
 
         return w
@@ -353,11 +540,23 @@ class FlagApp(QWidget):
         vbox = QVBoxLayout(w)
         vbox.setAlignment(Qt.AlignmentFlag.AlignCenter)
 
+        self.countdown_player_label = QLabel("")
+        self.countdown_player_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
+        self.countdown_player_label.setProperty("role", "name")
+        vbox.addWidget(self.countdown_player_label)
+
         self.countdown_label = QLabel("Starting in 5")
         self.countdown_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
-        self.countdown_label.setStyleSheet("font-weight: bold; font-size: 48px;")
+        self.countdown_label.setProperty("role", "big")
         vbox.addWidget(self.countdown_label)
 
+        # Only shown while a queue is running
+        self.btn_stop_queue = QPushButton("Stop Queue")
+        self.btn_stop_queue.setMinimumHeight(40)
+        self.btn_stop_queue.clicked.connect(self.stop_queue)
+        self.btn_stop_queue.hide()
+        vbox.addWidget(self.btn_stop_queue)
+
         return w
 
     def make_go_screen(self):
@@ -365,12 +564,12 @@ class FlagApp(QWidget):
         vbox = QVBoxLayout()
         vbox.setAlignment(Qt.AlignmentFlag.AlignCenter)
         w.setLayout(vbox)
-
-        w.setStyleSheet("background-color: green;")
+        # Green background comes from #go_screen in dark_style
+        w.setAttribute(Qt.WidgetAttribute.WA_StyledBackground, True)
 
         self.go_label = QLabel("GO")
         self.go_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
-        self.go_label.setStyleSheet("font-weight: bold; font-size: 48px; color: white;")
+        self.go_label.setProperty("role", "big")
         vbox.addWidget(self.go_label)
 
         return w
@@ -384,17 +583,53 @@ class FlagApp(QWidget):
         # Header
         self.stats_header = QLabel("Player Stats")
         self.stats_header.setAlignment(Qt.AlignmentFlag.AlignCenter)
-        self.stats_header.setStyleSheet("font-weight: bold; font-size: 22px;")
+        self.stats_header.setProperty("role", "header")
         vbox.addWidget(self.stats_header)
 
-        # Matplotlib canvas
-        self.stats_canvas = FigureCanvas(Figure(figsize=(8, 5)))
-        vbox.addWidget(self.stats_canvas)
+        # Score chart (matplotlib or native, see score_chart.py); created by
+        # ensure_stats_canvas once warm-up has imported the backend
+        self.stats_canvas = None
+        self.stats_layout = vbox
 
-        # Back button
+        nav = QHBoxLayout()
         back_btn = QPushButton("Back to Leaderboard")
         back_btn.setMinimumHeight(40)
         back_btn.clicked.connect(lambda: self.switch_to(self.leaderboard_screen))
+        nav.addWidget(back_btn)
+
+        history_btn = QPushButton("Session History")
+        history_btn.setMinimumHeight(40)
+        history_btn.clicked.connect(self.show_session_history)
+        nav.addWidget(history_btn)
+
+        vbox.addLayout(nav)
+
+        return w
+
+    def make_history_screen(self):
+        w = QWidget()
+        vbox = QVBoxLayout(w)
+        vbox.setContentsMargins(40, 20, 40, 20)
+        vbox.setSpacing(15)
+
+        self.history_header = QLabel("Session History")
+        self.history_header.setAlignment(Qt.AlignmentFlag.AlignCenter)
+        self.history_header.setProperty("role", "header")
+        vbox.addWidget(self.history_header)
+
+        # Older sessions are fetched a page at a time as the user scrolls down
+        self.history_table = QTableWidget(0, 4)
+        self.history_table.setHorizontalHeaderLabels(["Date", "Difficulty", "Flags", "Score"])
+        self.history_table.setColumnWidth(0, 220)
+        self.history_table.setColumnWidth(1, 120)
+        self.history_table.setColumnWidth(2, 80)
+        self.history_table.setColumnWidth(3, 80)
+        self.attach_infinite_scroll(self.history_table, self.load_more_history)
+        vbox.addWidget(self.history_table)
+
+        back_btn = QPushButton("Back to Stats")
+        back_btn.setMinimumHeight(40)
+        back_btn.clicked.connect(lambda: self.switch_to(self.stats_screen))
         vbox.addWidget(back_btn)
 
         return w
@@ -404,11 +639,28 @@ class FlagApp(QWidget):
     # Helper Methods
     # --------------------------
     def switch_to(self, widget):
+        if self.watchdog:
+            self.watchdog.mark_transition(widget.objectName())
+        if widget is self.leaderboard_screen and self.leaderboard_stale:
+            self.update_leaderboard()
         self.stack.setCurrentWidget(widget)
+        if widget is self.round_screen and self.touch_log:
+            self.touch_log.start()
+
+    def attach_infinite_scroll(self, table, fetch_more):
+        # Ask for the next page once the scrollbar gets close to the bottom
+        bar = table.verticalScrollBar()
+
+        def on_scroll(value):
+            if bar.maximum() > 0 and value >= bar.maximum() - 2:
+                fetch_more()
+
+        bar.valueChanged.connect(on_scroll)
 
-    def load_players(self):
+    def load_players(self, players=None):
         self.player_list.clear()
-        players = db.get_all_players()  # returns (player_id, name, position, side)
+        if players is None:
+            players = db.get_all_players()  # returns (player_id, name, position, side)
         for pid, name, position, side in players:
             display = f"{name} ({position or 'N/A'}, {side or 'N/A'})"
             item = QListWidgetItem(display)
@@ -439,13 +691,14 @@ class FlagApp(QWidget):
         self.select_player(pid)
 
     def select_player(self, pid):
-        player = db.get_player_by_id(pid)
+        player = db.get_player_by_id(pid, include_archived=False)
         if player:
             self.current_player = player
             self.selected_difficulty = None
             self.player_label.setText(f"Player: {self.current_player['name']}")
             self.difficulty_label.setText("Selected Mode: None")
             self.switch_to(self.player_screen)
+            self.prefetch_stats()
 
     def choose_difficulty(self, diff):
         self.selected_difficulty = diff
@@ -455,76 +708,317 @@ class FlagApp(QWidget):
         if not self.selected_difficulty:
             QMessageBox.warning(self, "No Mode", "Select a difficulty first.")
             return
+        self.begin_countdown()
+
+    def begin_countdown(self):
+        if self.maintenance:
+            self.maintenance.notify_activity()
+        self.round_token = uuid.uuid4().hex
+        name = self.current_player['name'] if self.current_player else ""
+        if self.queue:
+            name = f"{name} ({self.queue_index + 1}/{len(self.queue)})"
+        self.countdown_player_label.setText(name)
+        self.round_player_label.setText(name)
         self.countdown_value = 5  # Reset countdown
         self.countdown_label.setText(f"Starting in {self.countdown_value}")
         self.switch_to(self.countdown_screen)
-        self.timer.start(1000)
+        self.timer.start(COUNTDOWN_TICK_MS)
 
     def record_round(self, catches):
         if self.current_player and self.selected_difficulty is not None:
-            db.record_session(self.current_player['id'], self.selected_difficulty, catches)
+            if self.maintenance:
+                self.maintenance.notify_activity()
+            self.count_profiled_round()
+            if self.queue:
+                self.record_queued_round(catches)
+                return
+            session_id = db.record_session(self.current_player['id'], self.selected_difficulty, catches, self.round_token)
+            self.finish_touch_log(session_id)
             self.update_leaderboard()
             self.switch_to(self.leaderboard_screen)
+            self.patch_stats_cache(session_id)
+
+    # --------------------------
+    # Queue Mode
+    # --------------------------
+    # The operator picks several players and one difficulty; each player goes
+    # through countdown -> GO -> flag count in turn. Rounds are written in
+    # batches and the leaderboard is refreshed once at the end of the queue.
+    def start_queue(self):
+        items = self.player_list.selectedItems()
+        if not items:
+            QMessageBox.warning(self, "Queue Mode", "Select one or more players first.")
+            return
+        diff, ok = QInputDialog.getItem(
+            self, "Queue Mode", "Difficulty for every player:",
+            ["Easy", "Medium", "Hard", "Very Hard"], 0, False
+        )
+        if not ok:
+            return
+
+        # Keep the order the players appear in the list
+        items.sort(key=self.player_list.row)
+        players = [db.get_player_by_id(item.data(Qt.ItemDataRole.UserRole), include_archived=False)
+                   for item in items]
+        players = [p for p in players if p]
+        if not players:
+            # Deleted or archived since the list was loaded (e.g. from another kiosk)
+            QMessageBox.warning(self, "Queue Mode", "The selected players are no longer on the roster.")
+            self.load_players()
+            return
+        self.queue = players
+        self.queue_index = 0
+        self.queue_buffer = []
+        self.selected_difficulty = diff
+        self.btn_stop_queue.show()
+        self.next_in_queue()
 
-    def update_leaderboard(self):
+    def next_in_queue(self):
+        if not self.queue or self.queue_index >= len(self.queue):
+            self.finish_queue()
+            return
+        self.current_player = self.queue[self.queue_index]
+        self.player_label.setText(f"Player: {self.current_player['name']}")
+        self.difficulty_label.setText(f"Selected Mode: {self.selected_difficulty}")
+        self.begin_countdown()
+
+    def record_queued_round(self, catches):
+        self.queue_buffer.append((self.current_player['id'], self.selected_difficulty, catches, self.round_token))
+        self.finish_touch_log()
+        if len(self.queue_buffer) >= QUEUE_BATCH_SIZE:
+            self.flush_queue_buffer()
+        self.queue_index += 1
+        if self.queue_index < len(self.queue):
+            self.next_in_queue()
+        else:
+            self.finish_queue()
+
+    def flush_queue_buffer(self):
+        if self.queue_buffer:
+            session_ids = db.record_sessions(self.queue_buffer)
+            if self.touch_log:
+                for (_, _, _, token), session_id in zip(self.queue_buffer, session_ids):
+                    self.touch_log.link(token, session_id)
+            self.queue_buffer = []
+
+    def stop_queue(self):
+        self.timer.stop()
+        self.finish_queue()
+
+    def finish_queue(self):
+        self.flush_queue_buffer()
+        self.queue = None
+        self.btn_stop_queue.hide()
+        self.update_leaderboard()
+        self.switch_to(self.leaderboard_screen)
+
+    def update_leaderboard(self, rows=None):
+        self.leaderboard_stale = False
+        self.leaderboard_cursor = None
+        self.leaderboard_done = False
         self.table.setRowCount(0)
-        rows = db.get_leaderboard(top_n=10)
-        for row_num, (name, diff, catches, score) in enumerate(rows):
+        self.load_more_leaderboard(rows)
+
+    def load_more_leaderboard(self, rows=None):
+        if self.leaderboard_done:
+            return
+        if rows is None:
+            rows = db.get_leaderboard_page(self.leaderboard_cursor, PAGE_SIZE, self.best_per_player)
+        if len(rows) < PAGE_SIZE:
+            self.leaderboard_done = True
+        for session_id, name, diff, catches, score in rows:
+            row_num = self.table.rowCount()
             self.table.insertRow(row_num)
             self.table.setItem(row_num, 0, QTableWidgetItem(name))
             self.table.setItem(row_num, 1, QTableWidgetItem(diff))
             self.table.setItem(row_num, 2, QTableWidgetItem(str(catches)))
+        if rows:
+            self.leaderboard_cursor = (rows[-1][4], rows[-1][0])
+
+    def toggle_leaderboard_mode(self):
+        self.best_per_player = not self.best_per_player
+        self.btn_board_mode.setText("All Rounds" if self.best_per_player else "Best per Player")
+        self.update_leaderboard()
+
+    def show_session_history(self):
+        if not self.current_player:
+            return
+        self.history_header.setText(f"{self.current_player['name']}'s Sessions")
+        self.history_cursor = None
+        self.history_done = False
+        self.history_table.setRowCount(0)
+        self.load_more_history()
+        self.switch_to(self.history_screen)
+
+    def load_more_history(self):
+        if self.history_done or not self.current_player:
+            return
+        rows = db.get_player_sessions_page(self.current_player['id'], self.history_cursor, PAGE_SIZE)
+        if len(rows) < PAGE_SIZE:
+            self.history_done = True
+        for session_id, diff, catches, score, played_at in rows:
+            row_num = self.history_table.rowCount()
+            self.history_table.insertRow(row_num)
+            self.history_table.setItem(row_num, 0, QTableWidgetItem(played_at))
+            self.history_table.setItem(row_num, 1, QTableWidgetItem(diff))
+            self.history_table.setItem(row_num, 2, QTableWidgetItem(str(catches)))
+            self.history_table.setItem(row_num, 3, QTableWidgetItem(str(score)))
+        if rows:
+            self.history_cursor = (rows[-1][4], rows[-1][0])
 
     def show_player_stats(self):
         if not self.current_player:
             QMessageBox.warning(self, "No Player", "Select a player first.")
             return
 
-        sessions = db.get_player_sessions(self.current_player['id'])
-        if not sessions:
+        # Normally already fetched and drawn while the round was played
+        pid = self.current_player['id']
+        data = self.stats_cache
+        if data is None or data["player_id"] != pid:
+            # Keep the number of plotted points under the canvas width in pixels
+            data = self.stats_cache = load_stats_data(pid, self.stats_chart_width())
+        if not data["sessions"]:
             QMessageBox.information(self, "No Data", "No sessions found for this player.")
             return
+        if not data["rendered"]:
+            self.render_stats_cache()
 
-        # Parse data
-        from datetime import datetime
-        dates = [datetime.strptime(row[3], "%Y-%m-%d %H:%M:%S") for row in sessions]
-        scores = [row[2] for row in sessions]
+        # Switch to stats screen
+        self.switch_to(self.stats_screen)
 
-        # Clear previous figure
-        self.stats_canvas.figure.clear()
+    def render_stats_cache(self):
+        data = self.stats_cache
+        if not data or data["rendered"] or not data["sessions"] or not self.current_player:
+            return
 
-        # Plot on the embedded canvas
-        ax = self.stats_canvas.figure.add_subplot(111)
-        ax.plot(dates, scores, marker='o', linestyle='-', color='blue')
-        ax.set_title(f"{self.current_player['name']}'s Scores Over Time")
-        ax.set_xlabel("Date")
-        ax.set_ylabel("Score")
-        ax.grid(True)
-        self.stats_canvas.figure.autofmt_xdate()
-        self.stats_canvas.draw()
+        self.ensure_stats_canvas()
+        if data["bucket"] is None:
+            self.stats_canvas.plot(f"{self.current_player['name']}'s Scores Over Time",
+                                   data["dates"], data["means"])
+        else:
+            self.stats_canvas.plot(f"{self.current_player['name']}'s Scores Over Time (per {data['bucket']})",
+                                   data["dates"], data["means"], data["lows"], data["highs"])
+        data["rendered"] = True
 
-        # Switch to stats screen
-        self.switch_to(self.stats_screen)
+    # --------------------------
+    # Stats Prefetch
+    # --------------------------
+    # Once a player is selected we know whose stats will be asked for next, so
+    # fetch them on a worker thread and draw the chart while the countdown runs.
+    # After each round the new session is patched into the cached data instead
+    # of querying everything again.
+    def prefetch_stats(self, keep_current=False):
+        """Fetch the current player's stats on the worker; keep_current serves the old ones meanwhile."""
+        if not self.current_player:
+            return
+        if not keep_current:
+            self.stats_cache = None
+        pid = self.current_player['id']
+        max_points = self.stats_chart_width()
+        self.prefetch_pool.submit(self._prefetch_stats_worker, pid, max_points)
+
+    def _prefetch_stats_worker(self, pid, max_points):
+        try:
+            self.stats_ready.emit(load_stats_data(pid, max_points))
+        except Exception:
+            log.exception("Stats prefetch failed")
+
+    def on_stats_ready(self, data):
+        if not self.current_player or data["player_id"] != self.current_player['id']:
+            return  # a different player was selected meanwhile
+        self.stats_cache = data
+        # Don't spend GUI time drawing while the athlete is entering their count
+        if self.stack.currentWidget() is not self.round_screen:
+            QTimer.singleShot(0, self.render_stats_cache)
+
+    def patch_stats_cache(self, session_id):
+        data = self.stats_cache
+        if not data or not self.current_player or data["player_id"] != self.current_player['id']:
+            return
+        row = db.get_session(session_id)
+        if row is None or session_id in data["patched"]:
+            # Same round written twice (corrected count): just fetch again
+            self.prefetch_stats()
+            return
+        data["patched"].add(session_id)
+        score = row[3]
+        when = datetime.strptime(row[4], "%Y-%m-%d %H:%M:%S")
+
+        if data["bucket"] is None:
+            if data["sessions"] + 1 > data["max_points"]:
+                self.prefetch_stats()  # time to switch to buckets
+                return
+            data["dates"].append(when)
+            data["counts"].append(1)
+            for key in ("lows", "means", "highs"):
+                data[key].append(score)
+        else:
+            start = bucket_start(when, data["bucket"])
+            if data["dates"] and data["dates"][-1] == start:
+                n = data["counts"][-1]
+                data["means"][-1] = (data["means"][-1] * n + score) / (n + 1)
+                data["lows"][-1] = min(data["lows"][-1], score)
+                data["highs"][-1] = max(data["highs"][-1], score)
+                data["counts"][-1] = n + 1
+            elif not data["dates"] or data["dates"][-1] < start:
+                data["dates"].append(start)
+                data["counts"].append(1)
+                for key in ("lows", "means", "highs"):
+                    data[key].append(score)
+            else:
+                self.prefetch_stats()
+                return
+        data["sessions"] += 1
+        data["rendered"] = False
+        # Redraw once the leaderboard is on screen
+        QTimer.singleShot(0, self.render_stats_cache)
 
 
     def delete_player_from_list(self):
-        item = self.player_list.currentItem()
-        if not item:
-            return
-        pid = item.data(Qt.ItemDataRole.UserRole)
-        player = db.get_player_by_id(pid)
-        if player:
-            result = QMessageBox.question(
-                self,
-                "Confirm Deletion",
-                f"Are you sure you want to delete player '{player['name']}'?",
-                QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No
-            )
-            if result == QMessageBox.StandardButton.Yes:
-                db.delete_player(pid)
-                self.load_players()
+        items = self.confirm_selected_players(
+            "Confirm Deletion", "delete", "Their sessions are deleted too. This can't be undone.")
+        if items:
+            db.delete_players([item.data(Qt.ItemDataRole.UserRole) for item in items])
+            self.remove_player_items(items)
         self.switch_to(self.start_screen)
 
+    def archive_players_from_list(self):
+        items = self.confirm_selected_players(
+            "Confirm Archive", "archive",
+            "They leave the roster and leaderboards; their sessions stay in CSV exports.")
+        if items:
+            db.archive_players([item.data(Qt.ItemDataRole.UserRole) for item in items])
+            self.remove_player_items(items)
+        self.switch_to(self.start_screen)
+
+    def confirm_selected_players(self, title, verb, detail):
+        """Ask before a bulk roster change; returns the selected items or []."""
+        items = self.player_list.selectedItems()
+        if not items:
+            return []
+        who = f"player '{items[0].text()}'" if len(items) == 1 else f"{len(items)} players"
+        result = QMessageBox.question(
+            self,
+            title,
+            f"Are you sure you want to {verb} {who}?\n\n{detail}",
+            QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No
+        )
+        return items if result == QMessageBox.StandardButton.Yes else []
+
+    def remove_player_items(self, items):
+        # Drop just these rows instead of reloading the whole list, then
+        # refresh what may have shown them once for the whole batch
+        removed = {item.data(Qt.ItemDataRole.UserRole) for item in items}
+        self.player_list.setUpdatesEnabled(False)
+        for row in sorted((self.player_list.row(item) for item in items), reverse=True):
+            self.player_list.takeItem(row)
+        self.player_list.setUpdatesEnabled(True)
+        if self.current_player and self.current_player['id'] in removed:
+            self.current_player = None
+        if self.stats_cache and self.stats_cache["player_id"] in removed:
+            self.stats_cache = None
+        self.update_leaderboard()
+
     # slight issue, after first time clicking play_again, automatically tosses to player_screen. No way to play indefinitely
     def play_again(self):
         global selected_difficulty
@@ -533,7 +1027,28 @@ class FlagApp(QWidget):
         self.switch_to(self.player_screen)
     
     def export_csv(self):
-        local_path, onedrive_path = db.export_to_csv()
+        self.btn_export.setEnabled(False)
+        self.btn_export.setText("Exporting…")
+        self.export_pool.submit(self._export_worker)
+
+    def _export_worker(self):
+        # Runs on export_pool; the result goes back through export_ready
+        try:
+            local_path, onedrive_path = db.export_to_csv()
+        except Exception as ex:
+            log.exception("CSV export failed")
+            self.export_ready.emit({"error": ex})
+            return
+        self.export_ready.emit({"local": local_path, "onedrive": onedrive_path,
+                                "snapshot_note": self.export_snapshot(local_path)})
+
+    def on_export_ready(self, result):
+        self.btn_export.setEnabled(True)
+        self.btn_export.setText("Export CSV")
+        if "error" in result:
+            QMessageBox.critical(self, "CSV Export", f"❌ CSV export failed:\n{result['error']}")
+            return
+        local_path, onedrive_path = result["local"], result["onedrive"]
 
         if local_path and onedrive_path:
             message = (
@@ -548,10 +1063,197 @@ class FlagApp(QWidget):
         else:
             message = "❌ CSV export failed — no files were created."
 
-        QMessageBox.information(self, "CSV Export", message)
+        QMessageBox.information(self, "CSV Export", message + result["snapshot_note"])
+
+    def export_snapshot(self, csv_path):
+        """
+        Write the columnar .npz snapshot next to the CSV; returns a line for the
+        export message. Runs on the export worker.
+        """
+        if not csv_path:
+            return ""
+        path = Path(csv_path).with_suffix(".npz")
+        try:
+            count = export_snapshot(path)
+        except ImportError:
+            return "\n\n⚠️ Analytics snapshot skipped (NumPy is not installed)."
+        except Exception as ex:
+            log.exception("Snapshot export failed")
+            return f"\n\n⚠️ Analytics snapshot failed: {ex}"
+        return f"\n\n📊 Analytics snapshot ({count} sessions): {path}"
 
     # --------------------------
-    # Import CSV (names only)
+    # Staged Startup
+    # --------------------------
+    def show_placeholders(self):
+        item = QListWidgetItem("Loading players…")
+        item.setFlags(Qt.ItemFlag.NoItemFlags)
+        self.player_list.addItem(item)
+        self.leaderboard_stale = True
+
+    def _warm_up_worker(self, best_per_player):
+        try:
+            self.warm_up_ready.emit({
+                "players": db.get_all_players(),
+                "leaderboard": db.get_leaderboard_page(None, PAGE_SIZE, best_per_player),
+                "best_per_player": best_per_player,
+            })
+        except Exception:
+            log.exception("Startup warm-up failed")
+            self.warm_up_ready.emit(None)
+        try:
+            # Then import matplotlib (for that backend) here rather than on the GUI thread
+            preload_chart_backend(self.chart_backend)
+        except Exception:
+            log.exception("Could not preload the %s chart backend", self.chart_backend)
+        self.warm_up_ready.emit({"chart": True})
+
+    def on_warm_up_ready(self, data):
+        if data and data.get("chart"):
+            self.ensure_stats_canvas()
+            self.startup_metrics["chart_ms"] = (time.perf_counter() - STARTED) * 1000
+            return
+        if data is None:
+            # Fall back to loading on the GUI thread
+            data = {"players": None, "leaderboard": None, "best_per_player": None}
+        self.player_list.setUpdatesEnabled(False)
+        self.load_players(data["players"])
+        self.player_list.setUpdatesEnabled(True)
+        if self.leaderboard_stale:
+            # Unless the mode was switched while loading
+            same_mode = data["best_per_player"] == self.best_per_player
+            self.update_leaderboard(data["leaderboard"] if same_mode else None)
+        self.interactive = True
+        self.startup_metrics["data_ms"] = (time.perf_counter() - STARTED) * 1000
+        self.report_startup()
+
+    def first_frame_done(self):
+        self.startup_metrics["first_frame_ms"] = (time.perf_counter() - STARTED) * 1000
+        self.report_startup()
+
+    def report_startup(self):
+        """Log time-to-interactive once the first frame is up and the data is in."""
+        metrics = self.startup_metrics
+        if "interactive_ms" in metrics or not metrics.get("first_frame_ms") or "data_ms" not in metrics:
+            return
+        metrics["interactive_ms"] = max(metrics["first_frame_ms"], metrics["data_ms"])
+        log.info("Startup: window built at %.0f ms, first frame at %.0f ms, data loaded at %.0f ms, "
+                 "interactive at %.0f ms (%d players, %d leaderboard rows)",
+                 metrics["built_ms"], metrics["first_frame_ms"], metrics["data_ms"],
+                 metrics["interactive_ms"], self.player_list.count(), self.table.rowCount())
+
+    def ensure_stats_canvas(self):
+        if self.stats_canvas is None:
+            self.stats_canvas = make_score_chart(self.chart_backend)
+            self.stats_layout.insertWidget(1, self.stats_canvas)
+        return self.stats_canvas
+
+    def stats_chart_width(self):
+        """Chart width in pixels (estimated from the screen until the chart exists)."""
+        if self.stats_canvas is not None:
+            return max(self.stats_canvas.width(), 1)
+        margins = self.stats_layout.contentsMargins()
+        return max(self.stats_screen.width() - margins.left() - margins.right(), 1)
+
+    # --------------------------
+    # Changes from other processes
+    # --------------------------
+    # Only commits from other processes (another kiosk, a CLI import, the
+    # sqlite3 shell) show up here; db.ChangeWatcher leaves out our own, which
+    # the screens have already applied.
+    def check_for_changes(self):
+        tables, player_ids = self.change_watcher.poll()
+        if not tables:
+            return
+
+        if "players" in tables:
+            selected = {item.data(Qt.ItemDataRole.UserRole) for item in self.player_list.selectedItems()}
+            self.player_list.setUpdatesEnabled(False)
+            self.load_players()
+            for row in range(self.player_list.count()):
+                item = self.player_list.item(row)
+                if item.data(Qt.ItemDataRole.UserRole) in selected:
+                    item.setSelected(True)
+            self.player_list.setUpdatesEnabled(True)
+
+        # Names and sessions both show on the leaderboard
+        if self.stack.currentWidget() is self.leaderboard_screen:
+            self.update_leaderboard()
+        else:
+            self.leaderboard_stale = True
+
+        if self.current_player and self.current_player['id'] in player_ids:
+            player = db.get_player_by_id(self.current_player['id'], include_archived=False)
+            if player is None:
+                # Deleted or archived elsewhere
+                self.current_player = None
+                self.stats_cache = None
+                return
+            self.current_player = player
+            self.prefetch_stats(keep_current=True)
+            if self.stack.currentWidget() is self.history_screen:
+                self.show_session_history()
+
+    # --------------------------
+    # Diagnostics
+    # --------------------------
+    def toggle_profile(self):
+        if self.profiler and self.profiler.running:
+            self.finish_profile(announce=True)
+            return
+        rounds, ok = QInputDialog.getInt(
+            self, "CPU Profile", "Profile the next how many rounds?", PROFILE_ROUNDS, 1, 1000
+        )
+        if not ok:
+            return
+        self.profile_rounds_left = rounds
+        self.profiler = SamplingProfiler()
+        self.profiler.start()
+        self.btn_profile.setText(f"Stop Profile ({rounds} rounds left)")
+
+    def count_profiled_round(self):
+        if not (self.profiler and self.profiler.running):
+            return
+        self.profile_rounds_left -= 1
+        if self.profile_rounds_left > 0:
+            self.btn_profile.setText(f"Stop Profile ({self.profile_rounds_left} rounds left)")
+        else:
+            # Once this round's write and leaderboard update are done
+            QTimer.singleShot(0, self.finish_profile)
+
+    def finish_profile(self, announce=False):
+        path = self.profiler.stop() if self.profiler else None
+        self.profiler = None
+        self.btn_profile.setText("Profile Next Rounds")
+        if path:
+            self.btn_profile.setToolTip(f"Last profile: {path}")
+        if announce:
+            message = f"📄 Profile written to:\n\n{path}" if path else "No samples were taken."
+            QMessageBox.information(self, "CPU Profile", message)
+
+    def toggle_memory_tracking(self):
+        if self.memory_tracker and self.memory_tracker.running:
+            # The tracker thread takes the final snapshot; don't wait for it here
+            self.memory_tracker.stop()
+            self.memory_tracker = None
+            self.btn_memory.setText("Start Memory Tracking")
+            QMessageBox.information(
+                self, "Memory Tracking",
+                "Tracking is stopping; a final snapshot will be written in the background.\n\n"
+                f"📂 Reports: {diagnostics_dir()}"
+            )
+            return
+        minutes, ok = QInputDialog.getInt(
+            self, "Memory Tracking", "Minutes between snapshots:", MEMORY_SNAPSHOT_MINUTES, 1, 24 * 60
+        )
+        if not ok:
+            return
+        self.memory_tracker = MemoryTracker(interval=minutes * 60)
+        self.memory_tracker.start()
+        self.btn_memory.setText("Stop Memory Tracking")
+
+    # --------------------------
+    # Import CSV (players, or sessions in export format)
     # --------------------------
     def import_csv(self):
         path, _ = QFileDialog.getOpenFileName(
@@ -561,7 +1263,12 @@ class FlagApp(QWidget):
             return
 
         try:
-            result = db.import_from_csv(path)  # expects 'name' column; ignores others
+            if db.is_session_csv(path):
+                # Session history in the export_to_csv format
+                result = db.import_sessions_from_csv(path)
+                self.update_leaderboard()
+            else:
+                result = db.import_from_csv(path)  # expects 'name' column; ignores others
             imported = result.get("imported", 0)
             skipped = result.get("skipped", 0)
             errors = result.get("errors", [])
@@ -598,34 +1305,37 @@ class FlagApp(QWidget):
     def switch_to_admin_mode(self):
         self.btn_login_admin.hide()
         self.btn_select.hide()
-        self.btn_create.show()
-        self.btn_delete.show()
-        #self.btn_view.show()
-        self.btn_export.show()
-        self.btn_import.show()
-        self.btn_logout.show()
+        self.admin_buttons.show()
 
         # Toggle or change header
         self.header_label.setText("Admin Panel")
-        self.header_label.setStyleSheet("font-weight: bold; font-size: 22px; color: orange;")
+        self.set_header_mode("admin")
 
         self.player_list.setFixedHeight(250)
+        # Several players can be picked for Queue Mode
+        self.player_list.setSelectionMode(QAbstractItemView.SelectionMode.ExtendedSelection)
 
     def switch_to_player_mode(self):
         self.btn_login_admin.show()
         self.btn_select.show()
-        self.btn_create.hide()
-        self.btn_delete.hide()
-        #self.btn_view.hide()
-        self.btn_export.hide()
-        self.btn_import.hide()
-        self.btn_logout.hide()
+        self.admin_buttons.hide()
 
         # Toggle or change header
         self.header_label.setText("Select Player")
-        self.header_label.setStyleSheet("font-weight: bold; font-size: 22px; color: white;")
+        self.set_header_mode("player")
 
         self.player_list.setFixedHeight(450)
+        self.player_list.setSelectionMode(QAbstractItemView.SelectionMode.SingleSelection)
+
+    def set_header_mode(self, mode):
+        # Colour comes from QLabel[role="header"][mode="admin"] in dark_style;
+        # only this label is re-polished, nothing else is restyled
+        if self.header_label.property("mode") == mode:
+            return
+        self.header_label.setProperty("mode", mode)
+        style = self.header_label.style()
+        style.unpolish(self.header_label)
+        style.polish(self.header_label)
 
     def update_countdown(self):
         self.countdown_value -= 1
@@ -634,22 +1344,38 @@ class FlagApp(QWidget):
         else:
             self.timer.stop()
             self.switch_to(self.go_screen)
-            QTimer.singleShot(1000, lambda: self.switch_to(self.round_screen))
+            QTimer.singleShot(COUNTDOWN_TICK_MS, lambda: self.switch_to(self.round_screen))
 
     def event(self, e):
+        if e.type() == QEvent.Type.Paint and "first_frame_ms" not in self.startup_metrics:
+            # Stamped once this first paint has been handled
+            self.startup_metrics["first_frame_ms"] = None
+            QTimer.singleShot(0, self.first_frame_done)
         if e.type() in (QEvent.Type.TouchBegin, QEvent.Type.TouchUpdate, QEvent.Type.TouchEnd):
             self.handle_touch(e)
             e.accept()
             return True
         return super().event(e)
 
+    def finish_touch_log(self, session_id=None):
+        if not self.touch_log:
+            return
+        # Written once the finger has lifted and, in queue mode, the batch is saved
+        self.touch_log.finish(self.round_token)
+        if session_id is not None:
+            self.touch_log.link(self.round_token, session_id)
+        QTimer.singleShot(TOUCH_TAIL_MS, self.touch_log.close)
+
     def handle_touch(self, event):
         if isinstance(event, QTouchEvent):
+            kind = TOUCH_KINDS[event.type()]
             for point in event.points():
-                pos = point.position()
+                pos = point.position()  # relative to this window, not the round screen
+                if self.touch_log:
+                    self.touch_log.record(kind, point.id(), point.state().value, pos.x(), pos.y())
                 if self.stack.currentWidget() == self.round_screen:
                     for btn in self.round_screen.findChildren(QPushButton):
-                        local_pos = btn.mapFrom(self.round_screen, pos.toPoint())
+                        local_pos = btn.mapFrom(self, pos.toPoint())
                         if btn.rect().contains(local_pos):
                             # Block re-firing the clicked signal by disabling first
                             btn.setEnabled(False)
@@ -708,11 +1434,164 @@ class PlayerInfoDialog(QDialog):
             "side": self.side_dropdown.currentText()
         }
 
+
+# ==============================
+# Spectator Leaderboard
+# ==============================
+class SpectatorWindow(QWidget):
+    """
+    Leaderboard-only window for a TV or second display. Follows the database's
+    change notifications instead of polling: a burst of changes costs one
+    top-N query, and only the rows that moved or changed are touched.
+    """
+    # Carries (kind, ids) from whichever thread wrote to the GUI thread
+    data_changed = pyqtSignal(str, object)
+
+    def __init__(self, rows=SPECTATOR_ROWS, best_per_player=False):
+        super().__init__()
+        self.rows = rows
+        self.best_per_player = best_per_player
+        self.setWindowTitle("Flag Reaction Test Leaderboard")
+        self.setObjectName("spectator")
+        self.setStyleSheet(dark_style)
+        self.resize(1280, 720)
+
+        vbox = QVBoxLayout(self)
+        vbox.setContentsMargins(60, 30, 60, 30)
+        header = QLabel("Leaderboard")
+        header.setAlignment(Qt.AlignmentFlag.AlignCenter)
+        header.setProperty("role", "header")
+        vbox.addWidget(header)
+
+        self.table = QTableWidget(0, 4)
+        self.table.setHorizontalHeaderLabels(["#", "Player", "Difficulty", "Flags"])
+        self.table.verticalHeader().setVisible(False)
+        self.table.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
+        self.table.setSelectionMode(QAbstractItemView.SelectionMode.NoSelection)
+        self.table.setFocusPolicy(Qt.FocusPolicy.NoFocus)
+        self.table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Stretch)
+        vbox.addWidget(self.table)
+
+        self.row_ids = []          # session_id shown in each table row
+        self.refresh_pending = False
+        self.data_changed.connect(self.on_data_changed)
+        self.listener = db.subscribe(self.data_changed.emit)
+        self.refresh()
+
+    def on_data_changed(self, kind, ids):
+        # Coalesce: a queue-mode batch or an import notifies several times in a row
+        if not self.refresh_pending:
+            self.refresh_pending = True
+            QTimer.singleShot(0, self.refresh)
+
+    def refresh(self):
+        self.refresh_pending = False
+        rows = db.get_leaderboard_page(None, self.rows, self.best_per_player)
+        wanted = [row[0] for row in rows]
+
+        self.table.setUpdatesEnabled(False)
+        try:
+            # Drop sessions that fell off the board (or were deleted)
+            keep = set(wanted)
+            for r in reversed(range(len(self.row_ids))):
+                if self.row_ids[r] not in keep:
+                    self.table.removeRow(r)
+                    del self.row_ids[r]
+            # Insert new sessions at their rank, move any that were re-ordered
+            for r, (session_id, name, diff, catches, score) in enumerate(rows):
+                if r >= len(self.row_ids) or self.row_ids[r] != session_id:
+                    if session_id in self.row_ids:
+                        old = self.row_ids.index(session_id)
+                        self.table.removeRow(old)
+                        del self.row_ids[old]
+                    self.table.insertRow(r)
+                    self.row_ids.insert(r, session_id)
+                self.set_row(r, (str(r + 1), name, diff, str(catches)))
+        finally:
+            self.table.setUpdatesEnabled(True)
+
+    def set_row(self, r, values):
+        for c, text in enumerate(values):
+            item = self.table.item(r, c)
+            if item is None:
+                self.table.setItem(r, c, QTableWidgetItem(text))
+            elif item.text() != text:
+                item.setText(text)
+
+    def closeEvent(self, event):
+        db.unsubscribe(self.listener)
+        super().closeEvent(event)
+
 # ==============================
 # Run App
 # ==============================
 if __name__ == "__main__":
-    app = QApplication(sys.argv)
-    window = FlagApp()
+    parser = argparse.ArgumentParser(description="Flag Reaction Test kiosk")
+    parser.add_argument("--db", help="database file, or :memory: (default: FLAG_DB_FILE or next to the app)")
+    parser.add_argument("--touch-log",
+                        help="binary log of count-screen touches "
+                             "(default: touch_log.bin next to the database, '' to disable)")
+    parser.add_argument("--chart", choices=CHART_BACKENDS,
+                        help="stats chart backend (default: FLAG_CHART_BACKEND or matplotlib)")
+    parser.add_argument("--spectator", action="store_true",
+                        help="also show a live leaderboard window (full screen on a second display)")
+    parser.add_argument("--http-port", type=int,
+                        help="serve the read-only JSON API for coaches' dashboards on this port")
+    parser.add_argument("--http-host", default="0.0.0.0", help="address for --http-port (default: all)")
+    args, qt_args = parser.parse_known_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(name)s %(levelname)s: %(message)s")
+
+    # ==============================
+    # Initialize Database
+    # ==============================
+    if args.db:
+        db.configure(args.db)
+    schema_started = time.perf_counter()
+    upgraded = db.setup_database()
+    log.info("Schema %s in %.1f ms", "created/upgraded" if upgraded else "current, DDL skipped",
+             (time.perf_counter() - schema_started) * 1000)
+
+    app = QApplication(sys.argv[:1] + qt_args)
+
+    # Hourly online snapshots into backups/ next to the database while the kiosk runs
+    backups = BackupScheduler()
+    backups.start()
+    app.aboutToQuit.connect(backups.stop)
+
+    # ANALYZE / incremental vacuum / integrity check after 10 idle minutes
+    maintenance = MaintenanceScheduler()
+    maintenance.start()
+    app.aboutToQuit.connect(maintenance.stop)
+
+    # Logs GUI stalls over 250 ms with a stack sample, and screen switch times
+    watchdog = EventLoopWatchdog()
+    watchdog.start()
+    app.aboutToQuit.connect(watchdog.stop)
+
+    # Every touch on the count screen, written per round with its session_id,
+    # so it belongs with the database those ids come from (none for :memory:)
+    if args.touch_log is None and not isinstance(db.get_storage(), db.MemoryStorage):
+        args.touch_log = Path(db.DB_FILE).resolve().with_name("touch_log.bin")
+    touch_log = TouchRecorder(args.touch_log) if args.touch_log else None
+    if touch_log:
+        app.aboutToQuit.connect(touch_log.close)
+
+    # Leaderboard, players and sessions as JSON for coaches' laptops
+    if args.http_port is not None:
+        api = ApiServer(args.http_host, args.http_port)
+        api.start()
+        app.aboutToQuit.connect(api.stop)
+
+    window = FlagApp(maintenance, watchdog, args.chart, touch_log)
     window.show()
+
+    if args.spectator:
+        spectator = SpectatorWindow()
+        tv = next((s for s in app.screens() if s != window.screen()), None)
+        if tv is not None:
+            spectator.move(tv.geometry().topLeft())
+            spectator.showFullScreen()
+        else:
+            spectator.show()
     sys.exit(app.exec())
\ No newline at end of file
@@ -0,0 +1,130 @@
+"""
+Headless score-over-time reports for every player.
+
+    python reports.py --out reports --format png --workers 4
+
+Fetches every session in one query, grouped by player, and renders one chart
+per player (the same chart as "My Stats" in the kiosk) on a process pool with
+matplotlib's Agg renderer. A manifest in the output folder remembers what each
+chart was drawn from, so players with no new or changed sessions are skipped.
+"""
+import argparse
+import hashlib
+import itertools
+import json
+import multiprocessing
+import re
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from pathlib import Path
+
+import database_setup as db
+
+MANIFEST_NAME = "manifest.json"
+
+
+def _slug(name):
+    return re.sub(r"[^A-Za-z0-9]+", "_", name).strip("_") or "player"
+
+
+def render_player_chart(name, played_at, scores, path):
+    """Draw one player's scores over time to `path` (PNG or PDF by extension)."""
+    # Plain Figure + Agg canvas: no pyplot, no GUI, safe in worker processes
+    from matplotlib.figure import Figure
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+
+    dates = [datetime.strptime(d, "%Y-%m-%d %H:%M:%S") for d in played_at]
+    fig = Figure(figsize=(8, 5))
+    FigureCanvasAgg(fig)
+    ax = fig.add_subplot(111)
+    ax.plot(dates, scores, marker='o' if len(scores) <= 500 else None, linestyle='-', color='blue')
+    ax.set_title(f"{name}'s Scores Over Time")
+    ax.set_xlabel("Date")
+    ax.set_ylabel("Score")
+    ax.grid(True)
+    fig.autofmt_xdate()
+    fig.savefig(path)
+    return str(path)
+
+
+def _load_manifest(out_dir):
+    try:
+        with open(out_dir / MANIFEST_NAME, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _grouped_sessions():
+    """Yield (player_id, name, [played_at...], [score...]) for every player with sessions."""
+    conn = db.get_connection()
+    cursor = conn.cursor()
+    cursor.execute("""
+        SELECT p.player_id, p.name, s.played_at, s.score
+        FROM sessions s
+        JOIN players p ON p.player_id = s.player_id
+        ORDER BY p.player_id, s.played_at, s.session_id
+    """)
+    try:
+        for (pid, name), rows in itertools.groupby(cursor, key=lambda r: (r[0], r[1])):
+            rows = list(rows)
+            yield pid, name, [r[2] for r in rows], [r[3] for r in rows]
+    finally:
+        conn.close()
+
+
+def generate_reports(out_dir="reports", fmt="png", workers=None, force=False):
+    """
+    Render a chart for every player whose sessions changed since the last run.
+    Returns {"rendered": [paths], "skipped": N}.
+    """
+    if fmt not in ("png", "pdf"):
+        raise ValueError(f"Unsupported format: '{fmt}'")
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    manifest = {} if force else _load_manifest(out_dir)
+
+    # Keyed by file name, so PNG and PDF runs don't invalidate each other
+    jobs = []
+    new_manifest = dict(manifest)
+    skipped = 0
+    for pid, name, played_at, scores in _grouped_sessions():
+        digest = hashlib.sha1(json.dumps([name, played_at, scores]).encode("utf-8")).hexdigest()
+        path = out_dir / f"{pid}-{_slug(name)}.{fmt}"
+        new_manifest[path.name] = digest
+        if manifest.get(path.name) == digest and path.exists():
+            skipped += 1
+            continue
+        jobs.append((name, played_at, scores, path))
+
+    rendered = []
+    if jobs:
+        # spawn keeps workers clean of any GUI/threads in the parent
+        ctx = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(max_workers=workers, mp_context=ctx) as pool:
+            futures = [pool.submit(render_player_chart, *job) for job in jobs]
+            for (name, _, _, path), future in zip(jobs, futures):
+                try:
+                    rendered.append(future.result())
+                except Exception as ex:
+                    print(f"Could not render report for {name}: {ex}")
+                    new_manifest.pop(path.name, None)
+
+    with open(out_dir / MANIFEST_NAME, "w", encoding="utf-8") as f:
+        json.dump(new_manifest, f, indent=1)
+    return {"rendered": rendered, "skipped": skipped}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Render a score chart for every player.")
+    parser.add_argument("--out", default="reports", help="output folder (default: reports)")
+    parser.add_argument("--format", default="png", choices=["png", "pdf"])
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: CPU count)")
+    parser.add_argument("--force", action="store_true", help="re-render every player")
+    parser.add_argument("--db", help="database file (default: FLAG_DB_FILE or next to the app)")
+    args = parser.parse_args()
+
+    if args.db:
+        db.configure(args.db)
+    result = generate_reports(args.out, args.format, args.workers, args.force)
+    print(f"Rendered {len(result['rendered'])} report(s), skipped {result['skipped']} unchanged.")
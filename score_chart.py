@@ -0,0 +1,289 @@
+"""
+Score-over-time charts for the stats screen.
+
+Two interchangeable widgets with the same plot() call:
+
+    ScoreChart            drawn with QPainter, no extra dependencies
+    MatplotlibScoreChart  the original matplotlib canvas, imported lazily
+
+make_score_chart() picks one by name; the kiosk reads the name from
+--chart or FLAG_CHART_BACKEND. The native chart keeps matplotlib (and numpy)
+out of memory entirely, which matters on the small kiosk boards.
+Compare both with benchmarks/chart_backends.py.
+"""
+import importlib
+import math
+from datetime import datetime
+
+from PyQt6.QtCore import Qt, QLineF, QPointF, QRectF
+from PyQt6.QtGui import QColor, QFont, QPainter, QPainterPath, QPen, QPixmap
+from PyQt6.QtWidgets import QSizePolicy, QWidget
+
+CHART_BACKENDS = ("matplotlib", "native")
+
+
+def make_score_chart(backend="matplotlib", parent=None):
+    """Return a chart widget for `backend` ("matplotlib" or "native")."""
+    if backend == "native":
+        return ScoreChart(parent)
+    if backend == "matplotlib":
+        return MatplotlibScoreChart(parent)
+    raise ValueError(f"Unknown chart backend: '{backend}'")
+
+
+def preload_chart_backend(backend="matplotlib"):
+    """
+    Import the modules a backend needs, so make_score_chart is quick later.
+    Only imports (no widgets), so it can run on a worker thread at startup.
+    """
+    if backend == "matplotlib":
+        # Nothing is used here: importing the modules MatplotlibScoreChart
+        # needs only warms the import cache
+        for module in ("matplotlib.backends.backend_qtagg", "matplotlib.figure"):
+            importlib.import_module(module)
+
+
+# ==============================
+# Native (QPainter) chart
+# ==============================
+def _nice_step(span, target_ticks):
+    """Round span/target_ticks to 1, 2, 2.5 or 5 times a power of ten."""
+    raw = span / max(target_ticks, 1)
+    magnitude = 10 ** math.floor(math.log10(raw))
+    for factor in (1, 2, 2.5, 5, 10):
+        if raw <= factor * magnitude:
+            return factor * magnitude
+    return 10 * magnitude
+
+
+def _date_format(span_seconds):
+    if span_seconds <= 2 * 86400:
+        return "%H:%M"
+    if span_seconds <= 365 * 86400:
+        return "%b %d"
+    return "%b %Y"
+
+
+class ScoreChart(QWidget):
+    """
+    Line chart of scores over time: axes, grid, date labels and markers, or a
+    min/max band around the mean for bucketed data. Drawn once into a pixmap
+    by plot() (and again on resize); paintEvent only copies the pixmap.
+    """
+
+    MARGINS = (60, 40, 20, 50)  # left, top, right, bottom
+    LINE_COLOR = QColor("#1f3fbf")
+    BAND_COLOR = QColor(31, 63, 191, 50)
+    GRID_COLOR = QColor("#d0d0d0")
+    TEXT_COLOR = QColor("#000000")
+    BACKGROUND = QColor("#ffffff")
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setSizePolicy(QSizePolicy.Policy.Expanding, QSizePolicy.Policy.Expanding)
+        self.setMinimumSize(320, 200)
+        self._title = ""
+        self._dates = []
+        self._means = []
+        self._lows = None
+        self._highs = None
+        self._pixmap = None
+
+    def plot(self, title, dates, means, lows=None, highs=None):
+        """Show `means` over `dates`; pass lows/highs to draw a min/max band."""
+        self._title = title
+        self._dates = list(dates)
+        self._means = list(means)
+        self._lows = list(lows) if lows is not None else None
+        self._highs = list(highs) if highs is not None else None
+        self._render()
+        self.update()
+
+    def clear(self):
+        self.plot("", [], [])
+
+    def resizeEvent(self, event):
+        super().resizeEvent(event)
+        self._render()
+
+    def paintEvent(self, event):
+        if self._pixmap is None:
+            self._render()
+        painter = QPainter(self)
+        painter.drawPixmap(0, 0, self._pixmap)
+        painter.end()
+
+    # --------------------------
+    # Drawing
+    # --------------------------
+    def _render(self):
+        ratio = self.devicePixelRatioF()
+        pixmap = QPixmap(max(int(self.width() * ratio), 1), max(int(self.height() * ratio), 1))
+        pixmap.setDevicePixelRatio(ratio)
+        pixmap.fill(self.BACKGROUND)
+        painter = QPainter(pixmap)
+        painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+        try:
+            self._draw(painter)
+        finally:
+            painter.end()
+        self._pixmap = pixmap
+
+    def _draw(self, painter):
+        left, top, right, bottom = self.MARGINS
+        plot = QRectF(left, top, self.width() - left - right, self.height() - top - bottom)
+        if plot.width() <= 0 or plot.height() <= 0:
+            return
+
+        font = QFont(self.font())
+        font.setPointSize(9)
+        painter.setFont(font)
+        metrics = painter.fontMetrics()
+
+        title_font = QFont(font)
+        title_font.setPointSize(12)
+        painter.setFont(title_font)
+        painter.setPen(self.TEXT_COLOR)
+        painter.drawText(QRectF(0, 0, self.width(), top), Qt.AlignmentFlag.AlignCenter, self._title)
+        painter.setFont(font)
+
+        if not self._dates:
+            painter.setPen(QPen(self.TEXT_COLOR, 1))
+            painter.drawRect(plot)
+            return
+
+        # Data ranges, padded so a single point or a flat line still has room
+        xs = [d.timestamp() for d in self._dates]
+        x_min, x_max = min(xs), max(xs)
+        if x_max == x_min:
+            x_min, x_max = x_min - 86400, x_max + 86400
+        lows = self._lows if self._lows is not None else self._means
+        highs = self._highs if self._highs is not None else self._means
+        y_min, y_max = min(lows), max(highs)
+        if y_max == y_min:
+            y_min, y_max = y_min - 1, y_max + 1
+        y_pad = (y_max - y_min) * 0.05
+        y_min, y_max = y_min - y_pad, y_max + y_pad
+
+        def px(x):
+            return plot.left() + (x - x_min) / (x_max - x_min) * plot.width()
+
+        def py(y):
+            return plot.bottom() - (y - y_min) / (y_max - y_min) * plot.height()
+
+        # Y grid and labels
+        step = _nice_step(y_max - y_min, plot.height() / 50)
+        value = math.ceil(y_min / step) * step
+        while value <= y_max:
+            y = py(value)
+            painter.setPen(QPen(self.GRID_COLOR, 1))
+            painter.drawLine(QPointF(plot.left(), y), QPointF(plot.right(), y))
+            painter.setPen(self.TEXT_COLOR)
+            label = f"{value:g}"
+            painter.drawText(QRectF(0, y - 10, left - 6, 20),
+                             Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignVCenter, label)
+            value += step
+
+        # X grid and date labels, evenly spaced in time
+        fmt = _date_format(x_max - x_min)
+        label_width = metrics.horizontalAdvance(datetime(2000, 12, 31, 23, 59).strftime(fmt)) + 20
+        ticks = max(int(plot.width() // label_width), 2)
+        for i in range(ticks + 1):
+            x_value = x_min + (x_max - x_min) * i / ticks
+            x = px(x_value)
+            painter.setPen(QPen(self.GRID_COLOR, 1))
+            painter.drawLine(QPointF(x, plot.top()), QPointF(x, plot.bottom()))
+            painter.setPen(self.TEXT_COLOR)
+            label = datetime.fromtimestamp(x_value).strftime(fmt)
+            painter.drawText(QRectF(x - label_width / 2, plot.bottom() + 4, label_width, 20),
+                             Qt.AlignmentFlag.AlignHCenter | Qt.AlignmentFlag.AlignTop, label)
+
+        # Axes and axis titles
+        painter.setPen(QPen(self.TEXT_COLOR, 1))
+        painter.drawRect(plot)
+        painter.drawText(QRectF(plot.left(), self.height() - 22, plot.width(), 20),
+                         Qt.AlignmentFlag.AlignCenter, "Date")
+        painter.save()
+        painter.translate(12, plot.center().y())
+        painter.rotate(-90)
+        painter.drawText(QRectF(-50, -10, 100, 20), Qt.AlignmentFlag.AlignCenter, "Score")
+        painter.restore()
+
+        points = [QPointF(px(x), py(y)) for x, y in zip(xs, self._means)]
+        painter.setClipRect(plot.adjusted(-4, -4, 4, 4))
+
+        # Min/max band for bucketed data
+        if self._lows is not None and self._highs is not None:
+            band = QPainterPath()
+            band.moveTo(px(xs[0]), py(self._highs[0]))
+            for x, y in zip(xs[1:], self._highs[1:]):
+                band.lineTo(px(x), py(y))
+            for x, y in zip(reversed(xs), reversed(self._lows)):
+                band.lineTo(px(x), py(y))
+            band.closeSubpath()
+            painter.fillPath(band, self.BAND_COLOR)
+
+        # Separate segments: stroking one long antialiased polyline makes Qt
+        # resolve every self-intersection and gets slow past a few hundred points
+        painter.setPen(QPen(self.LINE_COLOR, 2))
+        painter.drawLines([QLineF(a, b) for a, b in zip(points, points[1:])])
+
+        # Markers for individual sessions, skipped when they would overlap
+        if self._lows is None and len(points) <= plot.width() / 4:
+            painter.setBrush(self.LINE_COLOR)
+            painter.setPen(Qt.PenStyle.NoPen)
+            for point in points:
+                painter.drawEllipse(point, 3, 3)
+
+        # Legend for bucketed data
+        if self._lows is not None:
+            painter.setClipping(False)
+            x, y = plot.left() + 10, plot.top() + 10
+            painter.fillRect(QRectF(x, y, 18, 10), self.BAND_COLOR)
+            painter.setPen(self.TEXT_COLOR)
+            painter.drawText(QPointF(x + 24, y + 10), "Min / Max")
+            painter.setPen(QPen(self.LINE_COLOR, 2))
+            painter.drawLine(QPointF(x, y + 25), QPointF(x + 18, y + 25))
+            painter.setPen(self.TEXT_COLOR)
+            painter.drawText(QPointF(x + 24, y + 30), "Mean")
+
+
+# ==============================
+# Matplotlib chart
+# ==============================
+class MatplotlibScoreChart(QWidget):
+    """The matplotlib canvas behind the same plot() call."""
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        # Imported here so the native backend never loads matplotlib
+        from matplotlib.backends.backend_qtagg import FigureCanvasQTAgg as FigureCanvas
+        from matplotlib.figure import Figure
+        from PyQt6.QtWidgets import QVBoxLayout
+
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(0, 0, 0, 0)
+        self.canvas = FigureCanvas(Figure(figsize=(8, 5)))
+        layout.addWidget(self.canvas)
+
+    def plot(self, title, dates, means, lows=None, highs=None):
+        """Show `means` over `dates`; pass lows/highs to draw a min/max band."""
+        figure = self.canvas.figure
+        figure.clear()
+        ax = figure.add_subplot(111)
+        if lows is None or highs is None:
+            ax.plot(dates, means, marker='o', linestyle='-', color='blue')
+        else:
+            ax.fill_between(dates, lows, highs, color='blue', alpha=0.2, label="Min / Max")
+            ax.plot(dates, means, linestyle='-', color='blue', label="Mean")
+            ax.legend(loc="upper left")
+        ax.set_title(title)
+        ax.set_xlabel("Date")
+        ax.set_ylabel("Score")
+        ax.grid(True)
+        figure.autofmt_xdate()
+        self.canvas.draw()
+
+    def clear(self):
+        self.canvas.figure.clear()
+        self.canvas.draw()
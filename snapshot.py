@@ -0,0 +1,178 @@
+"""
+Columnar analytics snapshots of the session history.
+
+The CSV export is meant for people; every reload in pandas re-parses the
+names, categories and date strings of the whole history. A snapshot holds
+the same rows (sessions joined with players) as typed NumPy columns in one
+.npz file, so loading it is a straight copy into arrays:
+
+    from snapshot import load_snapshot
+    columns = load_snapshot("CSV/06-02-2025-1.npz")
+    columns["score"].mean()
+
+    from snapshot import snapshot_dataframe      # needs pandas
+    df = snapshot_dataframe("CSV/06-02-2025-1.npz")
+
+Columns, one row per session in session_id order:
+
+    session_id, player_id  int64
+    difficulty, side,      int8/int16 codes into <column>_categories
+      position             (-1 where the player has no side/position)
+    catches, score         int16 / int32
+    played_at              datetime64[s], the stored timestamp as written
+                           (NaT if it could not be read)
+
+plus player_names / player_name_ids for looking names up by player_id.
+
+The rows are read in chunks of one read transaction, so the file is a
+consistent point-in-time copy and kiosks can keep recording while it is
+written. Each column is spooled to a temporary file and deflated into the
+zip when the scan is done, so memory use stays at one chunk.
+"""
+import shutil
+import tempfile
+import zipfile
+from pathlib import Path
+
+import database_setup as db
+
+SNAPSHOT_VERSION = 1
+
+# name -> (dtype, SELECT expression); categorical columns are coded separately
+_COLUMNS = {
+    "session_id": ("<i8", "s.session_id"),
+    "player_id": ("<i8", "s.player_id"),
+    "difficulty": ("<i1", "s.difficulty"),
+    "position": ("<i2", "p.position"),
+    "side": ("<i1", "p.side"),
+    "catches": ("<i2", "s.catches"),
+    "score": ("<i4", "s.score"),
+    # Stored as 'YYYY-MM-DD HH:MM:SS'; '%s' reads that as seconds since 1970
+    "played_at": ("<M8[s]", "CAST(strftime('%s', s.played_at) AS INTEGER)"),
+}
+_CATEGORICAL = ("difficulty", "position", "side")
+_NAT = -2 ** 63
+
+
+def export_snapshot(path, chunk_size=50000):
+    """
+    Write every session to `path` as a compressed .npz of typed columns.
+    Returns the number of sessions written.
+    """
+    import numpy as np
+
+    conn = db.get_connection()
+    cursor = conn.cursor()
+    spools = {name: tempfile.TemporaryFile() for name in _COLUMNS}
+    try:
+        # One read transaction: categories, names and rows all from one snapshot
+        cursor.execute("BEGIN")
+        categories = {}
+        for name in _CATEGORICAL:
+            table = "sessions" if name == "difficulty" else "players"
+            cursor.execute(f"SELECT DISTINCT {name} FROM {table} WHERE {name} IS NOT NULL ORDER BY {name}")
+            categories[name] = [row[0] for row in cursor.fetchall()]
+        codes = {name: {label: code for code, label in enumerate(labels)}
+                 for name, labels in categories.items()}
+
+        cursor.execute("SELECT player_id, name FROM players ORDER BY player_id")
+        players = cursor.fetchall()
+
+        select = ", ".join(expr for _, expr in _COLUMNS.values())
+        total, last_id = 0, None
+        while True:
+            cursor.execute(f"""
+                SELECT {select}
+                FROM sessions s
+                JOIN players p ON p.player_id = s.player_id
+                {"WHERE s.session_id > ?" if last_id is not None else ""}
+                ORDER BY s.session_id
+                LIMIT ?
+            """, (last_id, chunk_size) if last_id is not None else (chunk_size,))
+            rows = cursor.fetchall()
+            if not rows:
+                break
+            for index, (name, (dtype, _)) in enumerate(_COLUMNS.items()):
+                values = [row[index] for row in rows]
+                if name in codes:
+                    lookup = codes[name]
+                    values = [lookup.get(v, -1) for v in values]
+                elif name == "played_at":
+                    # Same bytes as datetime64[s]; NaT is the smallest int64
+                    values = [_NAT if v is None else v for v in values]
+                    dtype = "<i8"
+                spools[name].write(np.array(values, dtype=dtype).tobytes())
+            total += len(rows)
+            last_id = rows[-1][0]
+        conn.rollback()
+    finally:
+        conn.close()
+
+    try:
+        path = Path(path)
+        tmp = path.with_name(path.name + ".part")
+        with zipfile.ZipFile(tmp, "w", compression=zipfile.ZIP_DEFLATED) as zf:
+            for name, (dtype, _) in _COLUMNS.items():
+                spool = spools[name]
+                spool.seek(0)
+                with zf.open(f"{name}.npy", "w", force_zip64=True) as f:
+                    np.lib.format.write_array_header_2_0(
+                        f, {"descr": dtype, "fortran_order": False, "shape": (total,)})
+                    shutil.copyfileobj(spool, f)
+            small = {f"{name}_categories": np.array(labels, dtype=str)
+                     for name, labels in categories.items()}
+            small["player_name_ids"] = np.array([pid for pid, _ in players], dtype="<i8")
+            small["player_names"] = np.array([name for _, name in players], dtype=str)
+            small["snapshot_version"] = np.array(SNAPSHOT_VERSION)
+            for name, array in small.items():
+                with zf.open(f"{name}.npy", "w") as f:
+                    np.lib.format.write_array(f, array, allow_pickle=False)
+        tmp.replace(path)
+    finally:
+        for spool in spools.values():
+            spool.close()
+    return total
+
+
+def load_snapshot(path):
+    """Load a snapshot written by export_snapshot as a dict of NumPy arrays."""
+    import numpy as np
+
+    with np.load(path, allow_pickle=False) as data:
+        columns = {name: data[name] for name in data.files}
+    version = int(columns.pop("snapshot_version", 0))
+    if version != SNAPSHOT_VERSION:
+        raise ValueError(f"Not a version {SNAPSHOT_VERSION} snapshot: {path}")
+    return columns
+
+
+def snapshot_dataframe(path):
+    """
+    Load a snapshot as a pandas DataFrame with Categorical columns and the
+    player's name looked up. Needs pandas.
+    """
+    import numpy as np
+    import pandas as pd
+
+    columns = load_snapshot(path)
+    frame = pd.DataFrame({name: columns[name] for name in _COLUMNS})
+    for name in _CATEGORICAL:
+        frame[name] = pd.Categorical.from_codes(columns[name], categories=columns[f"{name}_categories"])
+    positions = np.searchsorted(columns["player_name_ids"], columns["player_id"])
+    frame.insert(2, "player", pd.Categorical.from_codes(positions, categories=columns["player_names"]))
+    return frame
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Write a columnar .npz snapshot of all sessions.")
+    parser.add_argument("out", help="output file, e.g. sessions.npz")
+    parser.add_argument("--db", help="database file (default: FLAG_DB_FILE or next to the app)")
+    parser.add_argument("--chunk-size", type=int, default=50000)
+    args = parser.parse_args()
+
+    if args.db:
+        db.configure(args.db)
+    count = export_snapshot(args.out, args.chunk_size)
+    print(f"Wrote {count} sessions to {args.out}")
@@ -0,0 +1,27 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import database_setup as db
+
+
+@pytest.fixture
+def memdb():
+    """A fresh in-memory database with the full schema, configured for the test."""
+    storage = db.configure(":memory:")
+    db.setup_database()
+    yield storage
+    storage.close()
+    db.configure()
+
+
+@pytest.fixture
+def export_dir(tmp_path, monkeypatch):
+    """Run export_to_csv into tmp_path (and never into a real OneDrive folder)."""
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv("HOME", str(tmp_path))
+    monkeypatch.setenv("USERPROFILE", str(tmp_path))
+    return tmp_path
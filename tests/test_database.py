@@ -0,0 +1,325 @@
+import pytest
+
+import database_setup as db
+
+
+def count_sessions():
+    conn = db.get_connection()
+    try:
+        return conn.execute("SELECT COUNT(*) FROM sessions").fetchone()[0]
+    finally:
+        conn.close()
+
+
+def add_player_with_sessions(name="Avery", catches=(3, 5, 7, 9, 11)):
+    pid = db.create_player(name, "WR", "Offense")
+    db.record_sessions([(pid, "Medium", c, None) for c in catches])
+    return pid
+
+
+def set_played_at(session_id, played_at):
+    conn = db.get_connection()
+    conn.execute("UPDATE sessions SET played_at=? WHERE session_id=?", (played_at, session_id))
+    conn.commit()
+    conn.close()
+
+
+# ---------------------------
+# Keyset pagination
+# ---------------------------
+def walk_pages(fetch, cursor_of, limit):
+    rows, after = [], None
+    while True:
+        page = fetch(after, limit)
+        rows.extend(page)
+        if len(page) < limit:
+            return rows
+        after = cursor_of(page[-1])
+
+
+def test_leaderboard_pages_with_tied_scores(memdb):
+    avery, blake = db.create_player("Avery"), db.create_player("Blake")
+    # Seven sessions tied on 10 points, around others above and below
+    db.record_sessions([(avery, "Medium", 5, None)] * 4 + [(blake, "Medium", 5, None)] * 3
+                       + [(avery, "Hard", 9, None), (blake, "Easy", 1, None)])
+
+    for best in (False, True):
+        full = db.get_leaderboard_page(None, 100, best)
+        for limit in (1, 2, 3, 4):
+            paged = walk_pages(lambda after, n: db.get_leaderboard_page(after, n, best),
+                               lambda row: (row[4], row[0]), limit)
+            assert paged == full
+        assert len({row[0] for row in full}) == len(full)
+    assert len(db.get_leaderboard_page(None, 100)) == 9
+    # Ties go most recent first
+    tied = [row[0] for row in db.get_leaderboard_page(None, 100) if row[4] == 10]
+    assert len(tied) == 7
+    assert tied == sorted(tied, reverse=True)
+
+
+def test_player_session_pages_with_tied_times(memdb):
+    pid = db.create_player("Avery")
+    session_ids = db.record_sessions([(pid, "Easy", c, None) for c in range(10)])
+    # Two clusters of sessions recorded in the same second
+    for session_id in session_ids[:6]:
+        set_played_at(session_id, "2025-06-01 10:00:00")
+    for session_id in session_ids[6:]:
+        set_played_at(session_id, "2025-05-01 10:00:00")
+
+    for limit in (1, 3, 4, 10):
+        paged = walk_pages(lambda after, n: db.get_player_sessions_page(pid, after, n),
+                           lambda row: (row[4], row[0]), limit)
+        assert [row[0] for row in paged] == session_ids[6:] + session_ids[:6]
+
+
+# ---------------------------
+# Trend buckets
+# ---------------------------
+def test_trend_bucket_boundaries(memdb):
+    pid = db.create_player("Avery")
+    times = {
+        "2025-05-31 23:59:59": 1,   # Saturday
+        "2025-06-01 00:00:00": 2,   # Sunday: still the week of Monday 26 May
+        "2025-06-02 00:00:00": 3,   # Monday: a new week
+        "2025-06-30 23:59:59": 4,   # Monday, last second of June
+        "2025-07-01 00:00:00": 6,   # Tuesday: same week, new month
+    }
+    for played_at, catches in times.items():
+        set_played_at(db.record_session(pid, "Easy", catches), played_at)
+
+    assert [row[:2] for row in db.get_player_trend(pid, "day")] == [
+        ("2025-05-31", 1), ("2025-06-01", 1), ("2025-06-02", 1), ("2025-06-30", 1), ("2025-07-01", 1)]
+    assert db.get_player_trend(pid, "week") == [
+        ("2025-05-26", 2, 1, 1.5, 2), ("2025-06-02", 1, 3, 3.0, 3), ("2025-06-30", 2, 4, 5.0, 6)]
+    assert db.get_player_trend(pid, "month") == [
+        ("2025-05-01", 1, 1, 1.0, 1), ("2025-06-01", 3, 2, 3.0, 4), ("2025-07-01", 1, 6, 6.0, 6)]
+    assert db.get_player_bucket_counts(pid) == {"sessions": 5, "day": 5, "week": 3, "month": 3}
+
+
+def test_trend_rejects_unknown_bucket(memdb):
+    with pytest.raises(ValueError):
+        db.get_player_trend(1, "year")
+
+
+# ---------------------------
+# CSV import
+# ---------------------------
+def test_player_import_returns_summary(memdb, tmp_path):
+    path = tmp_path / "players.csv"
+    path.write_text("Name,Position,Side\nAvery,WR,Offense\nBlake,QB,offense\n,WR,Offense\n")
+
+    first = db.import_from_csv(str(path))
+    assert first == {"imported": 2, "skipped": 1, "duplicates": 0, "errors": [(4, "Missing 'name'")]}
+
+    again = db.import_from_csv(str(path))
+    assert again["imported"] == 0
+    assert again["duplicates"] == 2
+    assert len(db.get_all_players()) == 2
+
+
+def test_session_reimport_skips_duplicates(memdb, export_dir):
+    add_player_with_sessions()
+    local_file, _ = db.export_to_csv()
+
+    result = db.import_sessions_from_csv(str(local_file), workers=1)
+
+    assert result["imported"] == 0
+    assert result["duplicates"] == 5
+    assert count_sessions() == 5
+
+
+def test_session_import_into_empty_database(memdb, export_dir):
+    add_player_with_sessions()
+    local_file, _ = db.export_to_csv()
+    empty = db.configure(":memory:")
+    try:
+        db.setup_database()
+        result = db.import_sessions_from_csv(str(local_file), workers=1)
+
+        assert result["imported"] == 5
+        assert [name for _, name, _, _ in db.get_all_players()] == ["Avery"]
+        assert count_sessions() == 5
+    finally:
+        empty.close()
+
+
+def test_reimport_after_rescore_adds_nothing(memdb, export_dir):
+    add_player_with_sessions()
+    # Hash the sessions with their original scores
+    db.import_sessions_from_csv(str(db.export_to_csv()[0]), workers=1)
+
+    db.add_scoring_rules({"Easy": 1, "Medium": 4, "Hard": 6, "Very Hard": 10})
+    assert db.recompute_scores(pause=0) == 5
+    result = db.import_sessions_from_csv(str(db.export_to_csv()[0]), workers=1)
+
+    assert result["imported"] == 0
+    assert count_sessions() == 5
+
+
+def test_upgrade_rehashes_sessions_without_the_score(memdb):
+    pid = db.create_player("Avery")
+    session_id = db.record_session(pid, "Medium", 5)
+    conn = db.get_connection()
+    played_at = conn.execute("SELECT played_at FROM sessions").fetchone()[0]
+    old_hash = db.hashlib.sha1("\x1f".join(("Avery", "Medium", "5", "10", played_at)).encode()).hexdigest()
+    conn.execute("UPDATE sessions SET content_hash=? WHERE session_id=?", (old_hash, session_id))
+    conn.execute("PRAGMA user_version=1")
+    conn.commit()
+    conn.close()
+
+    assert db.setup_database() is True
+
+    conn = db.get_connection()
+    stored = conn.execute("SELECT content_hash FROM sessions").fetchone()[0]
+    conn.close()
+    assert stored == db._session_hash("Avery", "Medium", 5, played_at)
+
+
+# ---------------------------
+# Round tokens
+# ---------------------------
+def test_round_token_upsert_keeps_one_row(memdb):
+    pid = db.create_player("Avery")
+    first = db.record_session(pid, "Hard", 4, round_token="round-1")
+    again = db.record_session(pid, "Hard", 6, round_token="round-1")
+
+    assert again == first
+    assert count_sessions() == 1
+    assert db.get_session(first)[1:4] == ("Hard", 6, 18)
+    assert db.get_leaderboard(best_per_player=True) == [("Avery", "Hard", 6, 18)]
+
+
+def test_failed_write_releases_the_write_lock(memdb):
+    pid = db.create_player("Avery")
+    with pytest.raises(ValueError):
+        db.record_sessions([(pid, "Easy", 3, None), (pid, "Impossible", 3, None)])
+
+    assert count_sessions() == 0
+    # Would fail with 'locked' if the failed transaction were still open
+    assert db.record_session(pid, "Easy", 3)
+    assert db.create_player("Blake")
+
+
+def test_corrected_round_is_not_imported_again(memdb, export_dir):
+    pid = db.create_player("Avery")
+    db.record_session(pid, "Hard", 4, round_token="round-1")
+    # An import hashes the round as it was first written
+    db.import_sessions_from_csv(str(db.export_to_csv()[0]), workers=1)
+
+    db.record_session(pid, "Hard", 6, round_token="round-1")
+    result = db.import_sessions_from_csv(str(db.export_to_csv()[0]), workers=1)
+
+    assert result["imported"] == 0
+    assert count_sessions() == 1
+
+
+# ---------------------------
+# Deleting players
+# ---------------------------
+def test_delete_players_cascades_to_sessions(memdb):
+    keep = add_player_with_sessions("Avery")
+    gone = add_player_with_sessions("Blake", catches=(20,))
+
+    assert db.delete_players([gone]) == 1
+
+    assert db.get_player_by_id(gone) is None
+    assert count_sessions() == 5
+    assert [row[0] for row in db.get_leaderboard(best_per_player=True)] == ["Avery"]
+    assert db.get_player_by_id(keep)["name"] == "Avery"
+
+
+# ---------------------------
+# Archiving players
+# ---------------------------
+def test_archived_player_comes_back_when_added_again(memdb):
+    pid = add_player_with_sessions("Avery")
+    assert db.archive_players([pid]) == 1
+    assert db.get_all_players() == []
+    assert db.get_leaderboard(best_per_player=True) == []
+
+    assert db.create_player("Avery", side="Defense") == pid
+
+    assert db.get_all_players() == [(pid, "Avery", "WR", "Defense")]
+    assert db.get_leaderboard(best_per_player=True) == [("Avery", "Medium", 11, 22)]
+    assert db.create_player("Avery") is None
+
+
+def test_player_import_restores_archived_players(memdb, tmp_path):
+    pid = add_player_with_sessions("Avery")
+    db.archive_players([pid])
+    path = tmp_path / "players.csv"
+    path.write_text("name\nAvery\n")
+
+    result = db.import_from_csv(str(path))
+
+    assert result["imported"] == 1
+    assert [row[0] for row in db.get_all_players()] == [pid]
+
+
+def test_rounds_for_archived_players_stay_off_the_leaderboards(memdb):
+    pid = add_player_with_sessions("Avery")
+    db.archive_players([pid])
+
+    db.record_session(pid, "Very Hard", 20)
+
+    assert db.get_leaderboard(best_per_player=True) == []
+    assert db.get_leaderboard() == []
+
+
+def test_unarchive_players(memdb):
+    pid = add_player_with_sessions("Avery")
+    db.archive_players([pid])
+
+    assert db.unarchive_players([pid]) == 1
+    assert db.unarchive_players([pid]) == 0
+    assert [row[0] for row in db.get_leaderboard(best_per_player=True)] == ["Avery"]
+
+
+# ---------------------------
+# Change detection
+# ---------------------------
+def insert_from_elsewhere(pid, catches):
+    """Write a session the way another process would, around this module."""
+    conn = db.get_connection()
+    conn.execute("INSERT INTO sessions (player_id, difficulty, catches, score) VALUES (?,?,?,?)",
+                 (pid, "Easy", catches, catches))
+    conn.commit()
+    conn.close()
+
+
+def test_change_watcher_skips_own_commits(memdb):
+    watcher = db.ChangeWatcher()
+    watcher.poll()
+    pid = add_player_with_sessions("Avery")
+    db.archive_players([pid])
+    db.unarchive_players([pid])
+    db.delete_players([db.create_player("Blake")])
+
+    assert watcher.poll() == (set(), set())
+    watcher.close()
+
+
+def test_change_watcher_reports_other_commits(memdb):
+    pid = db.create_player("Avery")
+    watcher = db.ChangeWatcher()
+    watcher.poll()
+
+    insert_from_elsewhere(pid, 3)
+    db.record_session(pid, "Hard", 4)
+
+    assert watcher.poll() == ({"sessions"}, {pid})
+    assert watcher.poll() == (set(), set())
+    watcher.close()
+
+
+def test_change_watcher_sees_a_rescore_from_elsewhere(memdb):
+    pid = add_player_with_sessions("Avery")
+    watcher = db.ChangeWatcher()
+    watcher.poll()
+    db.add_scoring_rules({"Easy": 1, "Medium": 4, "Hard": 6, "Very Hard": 10})
+    db.recompute_scores(pause=0)
+    # Forget that this process did it, as if another kiosk had rescored
+    db._own_changes.clear()
+
+    assert watcher.poll() == ({"sessions"}, {pid})
+    watcher.close()
@@ -0,0 +1,62 @@
+import http.client
+import json
+from urllib.parse import urlencode
+
+import pytest
+
+import database_setup as db
+from http_api import ApiServer
+
+
+@pytest.fixture
+def api(memdb):
+    server = ApiServer("127.0.0.1", 0)
+    server.start()
+    yield server
+    server.stop()
+
+
+def get(server, path, headers=None):
+    conn = http.client.HTTPConnection("127.0.0.1", server.port, timeout=5)
+    try:
+        conn.request("GET", path, headers=headers or {})
+        response = conn.getresponse()
+        return response.status, response.getheader("ETag"), response.read()
+    finally:
+        conn.close()
+
+
+def test_leaderboard_etag_until_a_write(api):
+    pid = db.create_player("Avery")
+    db.record_session(pid, "Easy", 3)
+
+    status, etag, body = get(api, "/leaderboard")
+    assert status == 200
+    assert [row["flags"] for row in json.loads(body)["rows"]] == [3]
+
+    status, same_etag, body = get(api, "/leaderboard", {"If-None-Match": etag})
+    assert (status, same_etag, body) == (304, etag, b"")
+
+    db.record_session(pid, "Easy", 5)
+    status, new_etag, body = get(api, "/leaderboard", {"If-None-Match": etag})
+    assert status == 200
+    assert new_etag != etag
+    assert [row["flags"] for row in json.loads(body)["rows"]] == [5, 3]
+
+
+def test_player_resources(api):
+    pid = db.create_player("Avery", "WR", "Offense")
+    db.record_sessions([(pid, "Easy", c, None) for c in range(3)])
+
+    status, _, body = get(api, f"/players/{pid}")
+    assert status == 200
+    assert json.loads(body)["name"] == "Avery"
+
+    status, _, body = get(api, f"/players/{pid}/sessions?limit=2")
+    page = json.loads(body)
+    assert [s["flags"] for s in page["sessions"]] == [0, 1]
+    status, _, body = get(api, f"/players/{pid}/sessions?limit=2&{urlencode(page['next'])}")
+    assert [s["flags"] for s in json.loads(body)["sessions"]] == [2]
+
+    assert get(api, "/players/999")[0] == 404
+    assert get(api, "/leaderboard?limit=abc")[0] == 400
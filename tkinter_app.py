@@ -1,3 +1,6 @@
+import queue
+import threading
+import uuid
 import tkinter as tk
 from tkinter import simpledialog, messagebox, ttk
 import database_setup as db
@@ -10,6 +13,45 @@ selected_difficulty = None
 countdown_value = 5
 difficulty_buttons = {}   # diff -> ttk.Button
 difficulty_wraps = {}     # diff -> wrapper Frame for hover outline
+round_token = None        # new for every round; makes a repeated write of one round harmless
+player_ids = []           # player_list row -> player_id
+leaderboard_rows = {}     # Treeview iid (session_id) -> shown values
+
+# ==============================
+# Background Database Worker
+# ==============================
+# Database calls run on one worker thread, in the order they were queued, so
+# slow storage never freezes the Tk event loop. Results come back through a
+# queue that the Tk thread polls with root.after; only the Tk thread touches widgets.
+POLL_MS = 50
+db_jobs = queue.Queue()
+db_results = queue.Queue()
+
+def run_in_background(func, *args, on_done=None, on_error=None):
+    db_jobs.put((func, args, on_done, on_error))
+
+def db_worker():
+    while True:
+        func, args, on_done, on_error = db_jobs.get()
+        try:
+            result = func(*args)
+        except Exception as e:
+            db_results.put((on_error or show_db_error, e))
+        else:
+            if on_done:
+                db_results.put((on_done, result))
+
+def poll_db_results():
+    try:
+        while True:
+            callback, value = db_results.get_nowait()
+            callback(value)
+    except queue.Empty:
+        pass
+    root.after(POLL_MS, poll_db_results)
+
+def show_db_error(error):
+    messagebox.showerror("Database Error", str(error))
 
 # ==============================
 # Helpers
@@ -21,30 +63,38 @@ def switch_frame(frame):
     frame.pack(fill="both", expand=True)
 
 def load_players():
+    run_in_background(db.get_all_players, on_done=show_players)
+
+def show_players(players):
+    # get_all_players returns (player_id, name, position, side)
+    player_ids[:] = [pid for pid, _, _, _ in players]
     player_list.delete(0, tk.END)
-    for pid, name in db.get_all_players():
-        player_list.insert(tk.END, f"{pid}: {name}")
+    player_list.insert(tk.END, *[f"{name} ({position or 'N/A'}, {side or 'N/A'})"
+                                 for _, name, position, side in players])
 
 def create_account():
     name = simpledialog.askstring("New Account", "Enter your name:")
     if name:
-        pid = db.create_player(name)
-        if not pid:
-            messagebox.showerror("Error", "Name already exists.")
-            return
-        load_players()
-        select_player(pid)
+        run_in_background(db.create_player, name, on_done=account_created)
+
+def account_created(pid):
+    if not pid:
+        messagebox.showerror("Error", "Name already exists.")
+        return
+    load_players()
+    select_player(pid)
 
 def select_player_from_list():
     selection = player_list.curselection()
     if not selection:
         return
-    pid = int(player_list.get(selection[0]).split(":")[0])
-    select_player(pid)
+    select_player(player_ids[selection[0]])
 
 def select_player(pid):
+    run_in_background(db.get_player_by_id, pid, on_done=show_player)
+
+def show_player(player):
     global current_player, selected_difficulty
-    player = db.get_player_by_id(pid)
     if player:
         current_player = player
         selected_difficulty = None
@@ -87,8 +137,9 @@ def start_round():
     start_countdown()
 
 def start_countdown():
-    global countdown_value
+    global countdown_value, round_token
     countdown_value = 5
+    round_token = uuid.uuid4().hex
     countdown_label.config(text=f"Starting in... {countdown_value}", fg="black", bg="white")
     switch_frame(countdown_frame)
     root.after(1000, update_countdown)
@@ -118,15 +169,33 @@ def proceed_to_round():
 def record_round(catches):
     global current_player, selected_difficulty
     if current_player and selected_difficulty is not None:
-        db.record_session(current_player['id'], selected_difficulty, catches)
-        update_leaderboard()
+        # Show the leaderboard straight away; it refreshes once the write lands
+        run_in_background(db.record_session, current_player['id'], selected_difficulty, catches,
+                          round_token, on_done=lambda _: update_leaderboard())
         switch_frame(leaderboard_frame)
 
 def update_leaderboard():
-    for row in leaderboard_table.get_children():
-        leaderboard_table.delete(row)
-    for name, diff, catches, score in db.get_leaderboard():
-        leaderboard_table.insert("", "end", values=(name, diff, catches))
+    run_in_background(db.get_leaderboard_page, None, 10, on_done=show_leaderboard)
+
+def show_leaderboard(rows):
+    # Rows are keyed by session_id: only changed, new or moved rows touch the Treeview
+    wanted = {str(session_id) for session_id, *_ in rows}
+    stale = [iid for iid in leaderboard_table.get_children() if iid not in wanted]
+    if stale:
+        leaderboard_table.delete(*stale)
+        for iid in stale:
+            leaderboard_rows.pop(iid, None)
+    for index, (session_id, name, diff, catches, score) in enumerate(rows):
+        iid = str(session_id)
+        values = (name, diff, catches)
+        if iid not in leaderboard_rows:
+            leaderboard_table.insert("", index, iid=iid, values=values)
+        else:
+            if leaderboard_rows[iid] != values:
+                leaderboard_table.item(iid, values=values)
+            if leaderboard_table.index(iid) != index:
+                leaderboard_table.move(iid, "", index)
+        leaderboard_rows[iid] = values
 
 def play_again():
     global selected_difficulty
@@ -138,20 +207,23 @@ def play_again():
     switch_frame(player_frame)
 
 def export_csv():
-    filename = db.export_to_csv()
-    messagebox.showinfo("CSV Exported", f"CSV data properly exported as {filename}.\nInsert USB to download latest CSV.")
+    run_in_background(db.export_to_csv, on_done=csv_exported)
+
+def csv_exported(files):
+    local_file, onedrive_file = files
+    messagebox.showinfo("CSV Exported", f"CSV data properly exported as {local_file}.\nInsert USB to download latest CSV.")
 
 def import_csv_ui():
     from tkinter import filedialog
     filepath = filedialog.askopenfilename(filetypes=[("CSV Files", "*.csv")])
     if filepath:
-        try:
-            db.import_from_csv(filepath)
+        def imported(_):
             load_players()
             update_leaderboard()
             messagebox.showinfo("CSV Imported", f"Successfully imported data from {filepath}.")
-        except Exception as e:
-            messagebox.showerror("Import Failed", f"Error importing CSV:\n{e}")
+
+        run_in_background(db.import_from_csv, filepath, on_done=imported,
+                          on_error=lambda e: messagebox.showerror("Import Failed", f"Error importing CSV:\n{e}"))
 
 
 # ==============================
@@ -296,6 +368,8 @@ ttk.Button(buttons_frame2, text="Play Again", style="Flat.TButton",
 # Initialize App
 # ==============================
 db.setup_database()
+threading.Thread(target=db_worker, name="db-worker", daemon=True).start()
+poll_db_results()
 load_players()
 update_leaderboard()
 switch_frame(start_frame)
@@ -0,0 +1,153 @@
+"""
+Touch telemetry for the count screen.
+
+Every touch point FlagApp.handle_touch sees while the count screen is up is
+packed into a preallocated ring buffer (a bytearray written with
+struct.pack_into, so recording allocates nothing per event). When the round
+is over the buffer is appended to a flat binary file with the round's
+session_id stamped on every record, so the file can be memory-mapped as one
+array:
+
+    from touch_log import load_touches
+    touches = load_touches("touch_log.bin", session_id=1234)
+    hesitation_ms = (touches["t_ns"][1] - touches["t_ns"][0]) / 1e6
+
+File layout: a 16-byte header (MAGIC, version, record size) followed by
+little-endian records of RECORD_FORMAT. Timestamps are time.perf_counter_ns()
+values: compare them within a round, not across app restarts.
+"""
+import logging
+import os
+import struct
+import time
+
+log = logging.getLogger(__name__)
+
+MAGIC = b"FLAGTCH1"
+VERSION = 1
+HEADER = struct.Struct("<8sII")
+# session_id, t_ns, x, y, point_id, kind, state
+RECORD_FORMAT = "<qqffhBB"
+RECORD = struct.Struct(RECORD_FORMAT)
+RECORD_SIZE = RECORD.size
+SESSION_ID = struct.Struct("<q")
+
+# Record kinds
+KIND_SHOWN = 0  # count screen shown; x, y, point_id and state are 0
+KIND_BEGIN = 1
+KIND_UPDATE = 2
+KIND_END = 3
+
+# Matches RECORD_FORMAT, for numpy readers
+TOUCH_DTYPE = [("session_id", "<i8"), ("t_ns", "<i8"), ("x", "<f4"), ("y", "<f4"),
+               ("point_id", "<i2"), ("kind", "u1"), ("state", "u1")]
+
+
+class TouchRecorder:
+    """
+    Ring buffer of touch records for the round in progress, plus the
+    bookkeeping to write each round once both its touches and its session_id
+    are known (queue mode only learns session ids when a batch is written).
+    """
+
+    def __init__(self, path, capacity=4096):
+        self.path = str(path)
+        self.capacity = capacity
+        self.dropped = 0                 # records overwritten because the ring was full
+        self._buf = bytearray(capacity * RECORD_SIZE)
+        self._count = 0
+        self._active = False
+        self._tail_key = None            # round that finished but is still taking its last touches
+        self._records = {}               # round key -> bytearray of records
+        self._sessions = {}              # round key -> session_id
+
+    # --------------------------
+    # Capture (GUI thread)
+    # --------------------------
+    def start(self):
+        """The count screen is up: clear the ring and start recording."""
+        if self._tail_key is not None:
+            self.close()
+        self._count = 0
+        self._active = True
+        self._pack(KIND_SHOWN, 0, 0, 0.0, 0.0)
+
+    def record(self, kind, point_id, state, x, y):
+        if self._active:
+            self._pack(kind, point_id, state, x, y)
+
+    def _pack(self, kind, point_id, state, x, y):
+        RECORD.pack_into(self._buf, (self._count % self.capacity) * RECORD_SIZE,
+                         0, time.perf_counter_ns(), x, y, point_id, kind, state)
+        self._count += 1
+
+    def finish(self, key):
+        """
+        The round was entered. Keep recording (the lifting finger is still to
+        come) until close() or the next start().
+        """
+        if self._active:
+            self._tail_key = key
+
+    def close(self):
+        """Stop recording and hand the finished round's records over for writing."""
+        key, self._tail_key = self._tail_key, None
+        if not self._active or key is None:
+            return
+        self._active = False
+        count = min(self._count, self.capacity)
+        if self._count > self.capacity:
+            self.dropped += self._count - self.capacity
+            split = (self._count % self.capacity) * RECORD_SIZE
+            records = self._buf[split:] + self._buf[:split]
+        else:
+            records = self._buf[:count * RECORD_SIZE]
+        self._records[key] = records
+        self._write_ready(key)
+
+    # --------------------------
+    # Writing
+    # --------------------------
+    def link(self, key, session_id):
+        """Tie a round key (its round token) to the session it was saved as."""
+        self._sessions[key] = session_id
+        while len(self._sessions) > 1000:
+            self._sessions.pop(next(iter(self._sessions)))
+        self._write_ready(key)
+
+    def _write_ready(self, key):
+        if key not in self._records or key not in self._sessions:
+            return
+        records = self._records.pop(key)
+        session_id = self._sessions.pop(key)
+        for offset in range(0, len(records), RECORD_SIZE):
+            SESSION_ID.pack_into(records, offset, session_id)
+        try:
+            new_file = not os.path.exists(self.path) or os.path.getsize(self.path) == 0
+            with open(self.path, "ab") as f:
+                if new_file:
+                    f.write(HEADER.pack(MAGIC, VERSION, RECORD_SIZE))
+                f.write(records)
+        except OSError:
+            log.exception("Could not write touch log %s", self.path)
+
+
+def load_touches(path, session_id=None):
+    """
+    Memory-map a touch log as a NumPy structured array (fields as in
+    TOUCH_DTYPE). With session_id, return a copy of that session's records only.
+    """
+    import numpy as np
+
+    with open(path, "rb") as f:
+        magic, version, record_size = HEADER.unpack(f.read(HEADER.size))
+    if magic != MAGIC or record_size != RECORD_SIZE:
+        raise ValueError(f"Not a version {VERSION} touch log: {path}")
+    # A partly written last record (power cut mid-append) is ignored
+    count = (os.path.getsize(path) - HEADER.size) // RECORD_SIZE
+    if count == 0:
+        return np.zeros(0, dtype=TOUCH_DTYPE)
+    touches = np.memmap(path, dtype=TOUCH_DTYPE, mode="r", offset=HEADER.size, shape=(count,))
+    if session_id is not None:
+        return np.array(touches[touches["session_id"] == session_id])
+    return touches
@@ -0,0 +1,107 @@
+"""
+Event-loop stall detection for the Qt kiosk.
+
+A QTimer on the GUI thread bumps a heartbeat; a background thread checks it.
+If the heartbeat is late by more than `threshold` seconds the GUI thread is
+stuck, so we log where it is stuck (a stack sample of the main thread) and, once
+it recovers, how long the stall lasted. Screen transitions are timed too: from
+switch_to() until the event loop is free again.
+"""
+import logging
+import sys
+import threading
+import time
+import traceback
+from collections import defaultdict, deque
+
+from PyQt6.QtCore import QTimer
+
+log = logging.getLogger(__name__)
+
+
+class EventLoopWatchdog:
+    def __init__(self, threshold=0.25, heartbeat_interval=0.05, keep=100):
+        self.threshold = threshold
+        self.heartbeat_interval = heartbeat_interval
+        self.stalls = deque(maxlen=keep)        # (wall time, seconds, main-thread stack)
+        self.transitions = defaultdict(list)    # screen name -> [seconds, ...]
+        self._last_beat = time.perf_counter()
+        self._stall = None                      # [wall time, stack] of the stall in progress
+        self._main_ident = None
+        self._timer = None
+        self._thread = None
+        self._stop = threading.Event()
+
+    # --------------------------
+    # Lifecycle (call from the GUI thread)
+    # --------------------------
+    def start(self):
+        self._main_ident = threading.get_ident()
+        self._last_beat = time.perf_counter()
+        self._timer = QTimer()
+        self._timer.timeout.connect(self._beat)
+        self._timer.start(int(self.heartbeat_interval * 1000))
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._watch, name="ui-watchdog", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._timer:
+            self._timer.stop()
+        if self._thread:
+            self._thread.join(1)
+        for line in self.summary_lines():
+            log.info(line)
+
+    # --------------------------
+    # Heartbeat
+    # --------------------------
+    def _beat(self):
+        now = time.perf_counter()
+        stall = self._stall
+        if stall is not None:
+            self._stall = None
+            lasted = now - self._last_beat
+            self.stalls.append((stall[0], lasted, stall[1]))
+            log.warning("GUI thread was blocked for %.0f ms", lasted * 1000)
+        self._last_beat = now
+
+    def _watch(self):
+        interval = self.heartbeat_interval
+        while not self._stop.wait(interval):
+            late = time.perf_counter() - self._last_beat
+            if late > self.threshold and self._stall is None:
+                stack = self._sample_main_stack()
+                self._stall = [time.time(), stack]
+                log.warning("GUI thread blocked for %.0f ms so far; main thread stack:\n%s",
+                            late * 1000, stack)
+
+    def _sample_main_stack(self):
+        frame = sys._current_frames().get(self._main_ident)
+        if frame is None:
+            return "<main thread not found>"
+        return "".join(traceback.format_stack(frame))
+
+    # --------------------------
+    # Screen transitions
+    # --------------------------
+    def mark_transition(self, screen):
+        """Call right before switching screens; timed until the loop is idle."""
+        started = time.perf_counter()
+        QTimer.singleShot(0, lambda: self._transition_done(screen, started))
+
+    def _transition_done(self, screen, started):
+        elapsed = time.perf_counter() - started
+        self.transitions[screen].append(elapsed)
+        if elapsed > self.threshold:
+            log.warning("Switching to %s took %.0f ms", screen, elapsed * 1000)
+
+    def summary_lines(self):
+        lines = [f"{len(self.stalls)} GUI stalls over {self.threshold * 1000:.0f} ms"]
+        for screen, times in sorted(self.transitions.items()):
+            lines.append(
+                f"{screen}: {len(times)} transitions, "
+                f"mean {sum(times) / len(times) * 1000:.1f} ms, max {max(times) * 1000:.1f} ms"
+            )
+        return lines